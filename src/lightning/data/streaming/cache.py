@@ -16,8 +16,8 @@ import os
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
 from lightning.data.datasets.env import _DistributedEnv
+from lightning.data.streaming.config import _get_index_filepath
 from lightning.data.streaming.constants import (
-    _INDEX_FILENAME,
     _LIGHTNING_CLOUD_GREATER_EQUAL_0_5_42,
     _TORCH_GREATER_EQUAL_2_1_0,
 )
@@ -31,6 +31,36 @@ if _LIGHTNING_CLOUD_GREATER_EQUAL_0_5_42:
 
 logger = logging.Logger(__name__)
 
+_FORMAT_TO_RATIO = {
+    "kb": 1000,
+    "mb": 1000**2,
+    "gb": 1000**3,
+    "tb": 1000**4,
+    "kib": 1 << 10,
+    "mib": 1 << 20,
+    "gib": 1 << 30,
+    "tib": 1 << 40,
+}
+
+
+def _convert_bytes_to_int(bytes_str: Union[int, str]) -> int:
+    """Convert a human readable size such as ``"200GB"`` into a number of bytes."""
+    if isinstance(bytes_str, int):
+        return bytes_str
+    normalized = bytes_str.strip().lower().replace(" ", "")
+    for suffix in sorted(_FORMAT_TO_RATIO, key=len, reverse=True):
+        if normalized.endswith(suffix):
+            try:
+                return int(float(normalized[: -len(suffix)]) * _FORMAT_TO_RATIO[suffix])
+            except ValueError:
+                break
+    if normalized.isdigit():
+        return int(normalized)
+    raise ValueError(
+        f"Unsupported size format `{bytes_str}`. Use an integer or a string such as `200GB`."
+        f" Supported units are {sorted(_FORMAT_TO_RATIO)}."
+    )
+
 
 class Cache:
     def __init__(
@@ -43,6 +73,10 @@ class Cache:
         chunk_size: Optional[int] = None,
         chunk_bytes: Optional[int] = None,
         item_loader: Optional[BaseItemLoader] = None,
+        max_cache_size: Optional[Union[int, str]] = None,
+        max_pre_download: int = 2,
+        num_downloaders: int = 1,
+        range_read: bool = False,
     ):
         """The Cache enables to optimise dataset format for cloud training. This is done by grouping several elements
         together in order to accelerate fetching.
@@ -57,6 +91,12 @@ class Cache:
             chunk_bytes: The maximum number of bytes within a chunk.
             chunk_size: The maximum number of items within a chunk.
             item_loader: The object responsible to generate the chunk intervals and load an item froma chunk.
+            max_cache_size: The maximum size of the downloaded chunks kept on the local disk, e.g. ``"200GB"``.
+                Once reached, the chunks already read are evicted. By default, the chunks are never evicted.
+            max_pre_download: The maximum number of chunks downloaded ahead of the chunk being read.
+            num_downloaders: The number of chunks downloaded concurrently.
+            range_read: Whether to read the items from the remote chunks with byte range requests instead of
+                downloading the chunks.
 
         """
         super().__init__()
@@ -81,7 +121,16 @@ class Cache:
             self._cache_dir = cache_dir
 
         self._writer = BinaryWriter(cache_dir, chunk_size=chunk_size, chunk_bytes=chunk_bytes, compression=compression)
-        self._reader = BinaryReader(cache_dir, remote_dir=remote_dir, compression=compression, item_loader=item_loader)
+        self._reader = BinaryReader(
+            cache_dir,
+            remote_dir=remote_dir,
+            compression=compression,
+            item_loader=item_loader,
+            max_cache_size=_convert_bytes_to_int(max_cache_size) if max_cache_size is not None else None,
+            max_pre_download=max_pre_download,
+            num_downloaders=num_downloaders,
+            range_read=range_read,
+        )
         self._is_done = False
         self._distributed_env = _DistributedEnv.detect()
 
@@ -90,7 +139,7 @@ class Cache:
         """Returns whether the caching phase is done."""
         if self._is_done:
             return True
-        self._is_done = os.path.exists(os.path.join(self._cache_dir, _INDEX_FILENAME))
+        self._is_done = _get_index_filepath(self._cache_dir) is not None
         return self._is_done
 
     def __setitem__(self, index: int, data: Any) -> None:
@@ -107,6 +156,13 @@ class Cache:
             index = ChunkedIndex(index, self._get_chunk_index_from_index(index))
         return self._reader.read(index)
 
+    def __getitems__(self, indexes: List[Union[int, ChunkedIndex]]) -> List[Any]:
+        """Read several items in the reader at once."""
+        # Look up the chunks of all the integer indexes at once.
+        chunk_indexes = iter(self._reader.chunk_indices_for([index for index in indexes if isinstance(index, int)]))
+        indexes = [ChunkedIndex(index, next(chunk_indexes)) if isinstance(index, int) else index for index in indexes]
+        return self._reader.read_many(indexes)
+
     def done(self) -> Optional[List[str]]:
         """Inform the writer the chunking phase is finished."""
         return self._writer.done()
@@ -12,21 +12,34 @@
 # limitations under the License.
 
 from abc import ABC, abstractclassmethod, abstractmethod
-from typing import Dict, TypeVar
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Tuple, TypeVar
 
 from lightning_utilities.core.imports import RequirementCache, requires
 
 _ZSTD_AVAILABLE = RequirementCache("zstd")
+_LZ4_AVAILABLE = RequirementCache("lz4")
 
 if _ZSTD_AVAILABLE:
     import zstd
 
+if _LZ4_AVAILABLE:
+    import lz4.frame
+
+# The chunks are compressed as independent frames, so several threads can compress a chunk at once.
+_COMPRESSION_FRAME_BYTES = 1 << 22
+
 TCompressor = TypeVar("TCompressor", bound="Compressor")
 
 
 class Compressor(ABC):
     """Base class for compression algorithm."""
 
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        pass
+
     @abstractmethod
     def compress(self, data: bytes) -> bytes:
         pass
@@ -71,6 +84,72 @@ class ZSTDCompressor(Compressor):
             compressors[f"zstd:{level}"] = ZSTDCompressor(level)
 
 
+class LZ4Compressor(Compressor):
+    """Compressor for the lz4 package.
+
+    It trades compression ratio for a much faster decompression than zstd.
+
+    """
+
+    @requires("lz4")
+    def __init__(self, level: int) -> None:
+        super().__init__()
+        self.level = level
+        self.extension = "lz4"
+
+    @property
+    def name(self) -> str:
+        return f"{self.extension}:{self.level}"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4.frame.decompress(data)
+
+    @classmethod
+    def register(cls, compressors: Dict[str, "Compressor"]) -> None:  # type: ignore
+        if not _LZ4_AVAILABLE:
+            return
+
+        # default
+        compressors["lz4"] = LZ4Compressor(0)
+
+        for level in list(range(0, 17)):
+            compressors[f"lz4:{level}"] = LZ4Compressor(level)
+
+
+def compress_frames(
+    compressor: Compressor, data: bytes, executor: Optional[Executor] = None
+) -> Tuple[bytes, List[int]]:
+    """Compress the data as a sequence of independent frames.
+
+    Returns the compressed data and the size of each compressed frame.
+
+    """
+    frames = [data[i : i + _COMPRESSION_FRAME_BYTES] for i in range(0, len(data), _COMPRESSION_FRAME_BYTES)]
+    compressed = list(executor.map(compressor.compress, frames)) if executor else list(map(compressor.compress, frames))
+    return b"".join(compressed), [len(frame) for frame in compressed]
+
+
+def decompress_frames(compressor: Compressor, data: bytes, frame_sizes: Optional[List[int]] = None) -> bytes:
+    """Decompress the data produced by ``compress_frames``.
+
+    The data is handled as a single frame when the frame sizes aren't provided.
+
+    """
+    if frame_sizes is None:
+        return compressor.decompress(data)
+
+    decompressed = []
+    offset = 0
+    for frame_size in frame_sizes:
+        decompressed.append(compressor.decompress(data[offset : offset + frame_size]))
+        offset += frame_size
+    return b"".join(decompressed)
+
+
 _COMPRESSORS: Dict[str, Compressor] = {}
 
 ZSTDCompressor.register(_COMPRESSORS)
+LZ4Compressor.register(_COMPRESSORS)
@@ -11,12 +11,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import os
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from lightning.data.streaming.constants import _INDEX_FILENAME, _TORCH_GREATER_EQUAL_2_1_0
+import numpy as np
+
+from lightning.data.streaming.compression import _COMPRESSORS, decompress_frames
+from lightning.data.streaming.constants import _BINARY_INDEX_FILENAME, _INDEX_FILENAME, _TORCH_GREATER_EQUAL_2_1_0
 from lightning.data.streaming.downloader import get_downloader_cls
+from lightning.data.streaming.index import ChunksIndex, load_index
 from lightning.data.streaming.item_loader import BaseItemLoader, PyTreeLoader, TokensLoader
 from lightning.data.streaming.sampler import ChunkedIndex
 
@@ -37,39 +40,115 @@ class ChunksConfig:
         """
         self._cache_dir = cache_dir
         self._intervals: List[Tuple[int, int]] = []
-        self._config = None
-        self._chunks = []
         self._remote_dir = remote_dir
         self._item_loader = item_loader or PyTreeLoader()
 
-        with open(os.path.join(self._cache_dir, _INDEX_FILENAME)) as f:
-            data = json.load(f)
-            self._config = data["config"]
-            self._validate_item_loader()
-            self._chunks.extend(data["chunks"])
+        # The binary index is memory mapped, the JSON index of the older datasets is converted to the same columns.
+        self._chunks: ChunksIndex
+        self._config, self._chunks = load_index(_get_index_filepath(self._cache_dir))
+        self._validate_item_loader()
 
         self._config["data_spec"] = treespec_loads(self._config["data_spec"])
 
         self._item_loader.setup(self._config, self._chunks)
         self._intervals = self._item_loader.generate_intervals()
         self._length = self._intervals[-1][-1]
+
+        # The intervals are contiguous, so the end of each interval is a prefix sum of the chunk lengths.
+        self._interval_ends = np.array(self._intervals, dtype=np.int64).reshape(-1, 2)[:, 1]
         self._downloader = None
 
         if remote_dir:
             self._downloader = get_downloader_cls(remote_dir)(remote_dir, cache_dir, self._chunks)
 
-    def download_chunk_from_index(self, chunk_index: int) -> None:
-        chunk_filename = self._chunks[chunk_index]["filename"]
+    def download_chunk_from_index(self, chunk_index: int) -> bool:
+        """Download the chunk if it isn't already available locally.
 
-        local_chunkpath = os.path.join(self._cache_dir, chunk_filename)
+        The compressed chunks are decompressed next to the downloaded file, which is then removed.
+
+        Returns whether a download was required.
+
+        """
+        local_chunkpath = self._get_local_chunkpath(chunk_index)
 
         if os.path.exists(local_chunkpath):
-            return
+            return False
+
+        compression = self._get_chunk_compression(chunk_index)
+        compressed_chunkpath = os.path.join(self._cache_dir, self._chunks.get_filename(chunk_index))
+
+        if not (compression and os.path.exists(compressed_chunkpath)):
+            if self._downloader is None:
+                raise RuntimeError("The downloader should be defined.")
+
+            self._downloader.download_chunk_from_index(chunk_index)
+
+        if compression:
+            self._decompress_chunk(chunk_index, compressed_chunkpath, local_chunkpath)
+
+            # The chunks of a local dataset are kept untouched.
+            if self._remote_dir:
+                os.remove(compressed_chunkpath)
+
+        return True
+
+    def _decompress_chunk(self, chunk_index: int, compressed_chunkpath: str, local_chunkpath: str) -> None:
+        compression = self._get_chunk_compression(chunk_index)
+        if compression not in _COMPRESSORS:
+            raise ValueError(
+                f"The chunk {chunk_index} is compressed with {compression}, which isn't available in"
+                f" {sorted(_COMPRESSORS)}."
+            )
+
+        with open(compressed_chunkpath, "rb") as f:
+            data = decompress_frames(_COMPRESSORS[compression], f.read(), self._chunks.get_frame_sizes(chunk_index))
 
+        # Write to a temporary file first, so a partially decompressed chunk is never read.
+        tmp_chunkpath = local_chunkpath + ".tmp"
+        with open(tmp_chunkpath, "wb") as f:
+            f.write(data)
+        os.replace(tmp_chunkpath, local_chunkpath)
+
+    def _get_chunk_compression(self, chunk_index: int) -> Optional[str]:
+        """Returns the codec of a chunk, falling back to the dataset one for the indexes without per chunk codec."""
+        return self._chunks.get_compression(chunk_index) or self.config.get("compression")
+
+    def _get_local_chunkpath(self, chunk_index: int) -> str:
+        """Returns the path of the decompressed chunk read by the item loader."""
+        chunk_filename = self._chunks.get_filename(chunk_index)
+        compression = self._get_chunk_compression(chunk_index)
+        if compression:
+            chunk_filename = chunk_filename.replace(f".{compression}.bin", ".bin")
+        return os.path.join(self._cache_dir, chunk_filename)
+
+    def read_chunk_ranges(self, chunk_index: int, ranges: List[Tuple[int, int]]) -> List[bytes]:
+        """Read the ``[begin, end)`` byte ranges of a remote chunk without downloading it."""
         if self._downloader is None:
             raise RuntimeError("The downloader should be defined.")
 
-        self._downloader.download_chunk_from_index(chunk_index)
+        if self._get_chunk_compression(chunk_index):
+            raise ValueError("Reading byte ranges isn't supported for compressed chunks.")
+
+        return self._downloader.read_chunk_ranges(chunk_index, ranges)
+
+    def get_chunk_bytes(self, chunk_index: int, local: bool = False) -> int:
+        """Returns the number of bytes of a chunk, either from the index or from its local file."""
+        if local:
+            chunk_filepath = self._get_local_chunkpath(chunk_index)
+            return os.path.getsize(chunk_filepath) if os.path.exists(chunk_filepath) else 0
+        return int(self._chunks.chunk_bytes[chunk_index])
+
+    def delete_chunk_from_index(self, chunk_index: int) -> int:
+        """Delete the local copy of a chunk and return the number of bytes freed."""
+        chunk_filepath = self._get_local_chunkpath(chunk_index)
+
+        if not os.path.exists(chunk_filepath):
+            return 0
+
+        num_bytes = os.path.getsize(chunk_filepath)
+        os.remove(chunk_filepath)
+        self._item_loader.delete(chunk_index, chunk_filepath)
+        return num_bytes
 
     @property
     def intervals(self) -> List[Tuple[int, int]]:
@@ -90,29 +169,45 @@ class ChunksConfig:
         return self._config
 
     def _get_chunk_index_from_index(self, index: int) -> int:
-        for chunk_index, internal in enumerate(self._intervals):
-            if internal[0] <= index < internal[1]:
-                return chunk_index
-        raise ValueError(
-            f"The provided index {index} didn't find a match within the chunk intervals {self._intervals}."
-        )
+        if not 0 <= index < self._length:
+            raise ValueError(
+                f"The provided index {index} didn't find a match within the chunk intervals [0, {self._length})."
+            )
+        # The empty chunks are skipped as their end is equal to the end of the previous chunk.
+        return int(np.searchsorted(self._interval_ends, index, side="right"))
+
+    def chunk_indices_for(self, indices: Sequence[int]) -> np.ndarray:
+        """Returns the index of the chunk containing each of the provided indices."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= self._length):
+            invalid = indices[(indices < 0) | (indices >= self._length)]
+            raise ValueError(
+                f"The provided indices {invalid.tolist()} didn't find a match within the chunk intervals"
+                f" [0, {self._length})."
+            )
+        return np.searchsorted(self._interval_ends, indices, side="right")
 
     def __getitem__(self, index: ChunkedIndex) -> Tuple[str, int, int]:
         """Find the associated chunk metadata."""
-        chunk = self._chunks[index.chunk_index]
-        return os.path.join(self._cache_dir, chunk["filename"]), *self._intervals[index.chunk_index]
+        return self._get_local_chunkpath(index.chunk_index), *self._intervals[index.chunk_index]
 
     @classmethod
     def load(
         cls, cache_dir: str, remote_dir: Optional[str] = None, item_loader: Optional[BaseItemLoader] = None
     ) -> Optional["ChunksConfig"]:
-        cache_index_filepath = os.path.join(cache_dir, _INDEX_FILENAME)
-
         if isinstance(remote_dir, str):
             downloader = get_downloader_cls(remote_dir)(remote_dir, cache_dir, [])
-            downloader.download_file(os.path.join(remote_dir, _INDEX_FILENAME), cache_index_filepath)
-
-        if not os.path.exists(cache_index_filepath):
+            try:
+                downloader.download_file(
+                    os.path.join(remote_dir, _BINARY_INDEX_FILENAME), os.path.join(cache_dir, _BINARY_INDEX_FILENAME)
+                )
+            except Exception:
+                # Fallback to the JSON index of the datasets optimized before the binary index was introduced.
+                downloader.download_file(
+                    os.path.join(remote_dir, _INDEX_FILENAME), os.path.join(cache_dir, _INDEX_FILENAME)
+                )
+
+        if _get_index_filepath(cache_dir) is None:
             return None
 
         return ChunksConfig(cache_dir, remote_dir, item_loader)
@@ -128,3 +223,12 @@ class ChunksConfig:
             and not isinstance(self._item_loader, TokensLoader)
         ):
             raise ValueError("Please, use Cache(..., item_loader=TokensLoader(block_size=...))")
+
+
+def _get_index_filepath(cache_dir: str) -> Optional[str]:
+    """Returns the path of the index, preferring the binary index over the JSON one."""
+    for filename in (_BINARY_INDEX_FILENAME, _INDEX_FILENAME):
+        filepath = os.path.join(cache_dir, filename)
+        if os.path.exists(filepath):
+            return filepath
+    return None
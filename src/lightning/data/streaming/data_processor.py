@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import signal
@@ -5,13 +6,16 @@ import tempfile
 import traceback
 import types
 from abc import abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from multiprocessing import Process, Queue
-from queue import Empty
+from queue import Empty, Full
 from shutil import copyfile, rmtree
+from threading import BoundedSemaphore, Lock
 from time import sleep, time
-from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
 from urllib import parse
 
+import numpy as np
 import torch
 from tqdm.auto import tqdm
 
@@ -19,6 +23,7 @@ from lightning import seed_everything
 from lightning.data.streaming import Cache
 from lightning.data.streaming.constants import (
     _BOTO3_AVAILABLE,
+    _BINARY_INDEX_FILENAME,
     _DEFAULT_FAST_DEV_RUN_ITEMS,
     _INDEX_FILENAME,
     _LIGHTNING_CLOUD_GREATER_EQUAL_0_5_42,
@@ -44,6 +49,26 @@ if _BOTO3_AVAILABLE:
 
 logger = logging.Logger(__name__)
 
+# The number of files transferred concurrently by each downloader and uploader process.
+_DEFAULT_TRANSFER_THREADS = 16
+# The number of files queued for upload before the workers wait for the uploader to catch up.
+_MAX_PENDING_UPLOADS = 32
+# The files larger than the threshold are transferred in parts of the given size, several parts at a time.
+_MULTIPART_THRESHOLD = 1 << 24
+_MULTIPART_CHUNKSIZE = 1 << 24
+_MULTIPART_CONCURRENCY = 8
+# The number of work units per worker with the dynamic scheduling. More units balance better, but each unit ends with
+# a partial chunk.
+_DEFAULT_WORK_UNITS_PER_WORKER = 4
+# Each rank records the chunks it wrote in a manifest and each uploader the files it uploaded, so an interrupted run
+# can be resumed after the last chunk available.
+_MANIFEST_SUFFIX = "manifest.jsonl"
+_UPLOADED_SUFFIX = "uploaded.txt"
+# The manifest of the optimized dataset, recording the items and the ranks used to write it.
+_DATASET_MANIFEST_FILENAME = "manifest.json"
+# The index of the optimized dataset the new items are appended to.
+_BASE_INDEX_FILENAME = "base.idx"
+
 
 def _get_cache_folder() -> str:
     """Returns the cache folder."""
@@ -88,6 +113,50 @@ def _get_s3_client() -> Any:
     return boto3.client("s3", config=botocore.config.Config(retries={"max_attempts": 1000, "mode": "standard"}))
 
 
+def _get_s3_transfer_config() -> Any:
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=_MULTIPART_THRESHOLD,
+        multipart_chunksize=_MULTIPART_CHUNKSIZE,
+        max_concurrency=_MULTIPART_CONCURRENCY,
+    )
+
+
+class _TransferPool:
+    """Run the file transfers on a pool of threads, with at most ``max_pending`` transfers queued or running.
+
+    Submitting blocks while the pool is full, which propagates the backpressure to the producer of the transfers.
+
+    """
+
+    def __init__(self, num_threads: int = _DEFAULT_TRANSFER_THREADS, max_pending: Optional[int] = None) -> None:
+        self._executor = ThreadPoolExecutor(num_threads)
+        self._semaphore = BoundedSemaphore(max_pending or 2 * num_threads)
+        self._errors: List[BaseException] = []
+
+    def submit(self, fn: Callable, *args: Any) -> None:
+        self._raise_on_error()
+        self._semaphore.acquire()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+
+    def join(self) -> None:
+        """Wait for all the transfers to complete."""
+        self._executor.shutdown(wait=True)
+        self._raise_on_error()
+
+    def _on_done(self, future: Future) -> None:
+        self._semaphore.release()
+        error = future.exception()
+        if error is not None:
+            self._errors.append(error)
+
+    def _raise_on_error(self) -> None:
+        if self._errors:
+            raise self._errors[0]
+
+
 def _wait_for_file_to_exist(s3: Any, obj: parse.ParseResult, sleep_time: int = 2) -> Any:
     """This function check."""
     while True:
@@ -105,6 +174,31 @@ def _download_data_target(
 ) -> None:
     """This function is used to download data from a remote directory to a cache directory to optimise reading."""
     s3 = _get_s3_client()
+    s3_transfer_config = _get_s3_transfer_config()
+
+    # 1. The items are downloaded concurrently, each one is reported as soon as all its files are available
+    pool = _TransferPool()
+
+    def download_item(index: int, paths: List[str]) -> None:
+        for path in paths:
+            remote_path = path.replace(input_dir, remote_input_dir)
+            obj = parse.urlparse(remote_path)
+            local_path = path.replace(input_dir, cache_dir)
+
+            if obj.scheme == "s3":
+                dirpath = os.path.dirname(local_path)
+
+                os.makedirs(dirpath, exist_ok=True)
+
+                with open(local_path, "wb") as f:
+                    s3.download_fileobj(obj.netloc, obj.path.lstrip("/"), f, Config=s3_transfer_config)
+
+            elif os.path.isfile(remote_path):
+                copyfile(remote_path, local_path)
+            else:
+                raise ValueError(f"The provided {remote_input_dir} isn't supported.")
+
+        queue_out.put(index)
 
     while True:
         # 2. Fetch from the queue
@@ -112,6 +206,7 @@ def _download_data_target(
 
         # 3. Terminate the process if we received a termination signal
         if r is None:
+            pool.join()
             queue_out.put(None)
             return
 
@@ -124,27 +219,11 @@ def _download_data_target(
             continue
 
         if remote_input_dir is not None:
-            # 6. Download all the required paths to unblock the current index
-            for path in paths:
-                remote_path = path.replace(input_dir, remote_input_dir)
-                obj = parse.urlparse(remote_path)
-                local_path = path.replace(input_dir, cache_dir)
-
-                if obj.scheme == "s3":
-                    dirpath = os.path.dirname(local_path)
-
-                    os.makedirs(dirpath, exist_ok=True)
-
-                    with open(local_path, "wb") as f:
-                        s3.download_fileobj(obj.netloc, obj.path.lstrip("/"), f)
-
-                elif os.path.isfile(remote_path):
-                    copyfile(remote_path, local_path)
-                else:
-                    raise ValueError(f"The provided {remote_input_dir} isn't supported.")
-
-        # 7. Inform the worker the current files are available
-        queue_out.put(index)
+            # 6. Download all the required paths to unblock the current index, then inform the worker
+            pool.submit(download_item, index, paths)
+        else:
+            # 7. Inform the worker the current files are available
+            queue_out.put(index)
 
 
 def _remove_target(input_dir: str, cache_dir: str, queue_in: Queue) -> None:
@@ -166,61 +245,188 @@ def _remove_target(input_dir: str, cache_dir: str, queue_in: Queue) -> None:
                     os.remove(cached_filepath)
 
 
-def _upload_fn(upload_queue: Queue, remove_queue: Queue, cache_dir: str, remote_output_dir: str) -> None:
+def _upload_fn(
+    upload_queue: Queue,
+    remove_queue: Queue,
+    cache_dir: str,
+    remote_output_dir: str,
+    uploaded_filepath: Optional[str] = None,
+) -> None:
     """This function is used to upload optimised chunks from a local to remote dataset directory."""
     obj = parse.urlparse(remote_output_dir)
+    lock = Lock()
 
     if obj.scheme == "s3":
         s3 = _get_s3_client()
+        s3_transfer_config = _get_s3_transfer_config()
+
+    def upload_file(local_filepath: str) -> None:
+        if obj.scheme == "s3":
+            s3.upload_file(
+                local_filepath,
+                obj.netloc,
+                os.path.join(obj.path.lstrip("/"), os.path.basename(local_filepath)),
+                Config=s3_transfer_config,
+            )
+        elif os.path.isdir(remote_output_dir):
+            copyfile(local_filepath, os.path.join(remote_output_dir, os.path.basename(local_filepath)))
+        else:
+            raise ValueError(f"The provided {remote_output_dir} isn't supported.")
+
+        # Record the uploaded file, so a resumed run doesn't need it locally anymore
+        if uploaded_filepath:
+            with lock, open(uploaded_filepath, "a") as f:
+                f.write(f"{os.path.basename(local_filepath)}\n")
+
+        # Inform the remover to delete the file
+        if remove_queue:
+            remove_queue.put([local_filepath])
+
+    # The files are uploaded concurrently. While the pool is full, the upload queue fills up and the workers wait.
+    pool = _TransferPool()
 
     while True:
         local_filepath: Optional[str] = upload_queue.get()
 
         # Terminate the process if we received a termination signal
         if local_filepath is None:
+            pool.join()
             return
 
         # Upload the file to the target cloud storage
         if not local_filepath.startswith(cache_dir):
             local_filepath = os.path.join(cache_dir, local_filepath)
 
-        if obj.scheme == "s3":
-            s3.upload_file(
-                local_filepath, obj.netloc, os.path.join(obj.path.lstrip("/"), os.path.basename(local_filepath))
-            )
-        elif os.path.isdir(remote_output_dir):
-            copyfile(local_filepath, os.path.join(remote_output_dir, os.path.basename(local_filepath)))
-        else:
-            raise ValueError(f"The provided {remote_output_dir} isn't supported.")
+        pool.submit(upload_file, local_filepath)
 
-        # Inform the remover to delete the file
-        if remove_queue:
-            remove_queue.put([local_filepath])
 
+def _read_manifest(filepath: str) -> List[Dict[str, Any]]:
+    """Returns the records of a rank manifest, ignoring the last record when it was partially written."""
+    if not os.path.exists(filepath):
+        return []
+    records = []
+    with open(filepath) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
 
-def _associated_items_to_workers(num_workers: int, user_items: List[Any]) -> Tuple[List[int], List[List[Any]]]:
-    # Associate the items to the workers based on number of nodes and node rank.
+
+def _read_uploaded_files(cache_dir: str) -> Set[str]:
+    """Returns the names of the files uploaded by the previous runs."""
+    uploaded_files: Set[str] = set()
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(_UPLOADED_SUFFIX):
+            with open(os.path.join(cache_dir, filename)) as f:
+                uploaded_files.update(line.strip() for line in f)
+    return uploaded_files
+
+
+def _upload_file(local_filepath: str, remote_output_dir: str) -> None:
+    obj = parse.urlparse(remote_output_dir)
+    if obj.scheme == "s3":
+        s3 = _get_s3_client()
+        s3.upload_file(local_filepath, obj.netloc, os.path.join(obj.path.lstrip("/"), os.path.basename(local_filepath)))
+    elif os.path.isdir(remote_output_dir):
+        copyfile(local_filepath, os.path.join(remote_output_dir, os.path.basename(local_filepath)))
+
+
+def _download_file(remote_output_dir: str, filename: str, local_filepath: str) -> bool:
+    """Download a file of the remote output directory and returns whether it exists."""
+    obj = parse.urlparse(os.path.join(remote_output_dir, filename))
+    if obj.scheme == "s3":
+        s3 = _get_s3_client()
+        try:
+            s3.head_object(Bucket=obj.netloc, Key=obj.path.lstrip("/"))
+        except botocore.exceptions.ClientError:
+            return False
+        with open(local_filepath, "wb") as f:
+            s3.download_fileobj(obj.netloc, obj.path.lstrip("/"), f)
+        return True
+    if os.path.isfile(os.path.join(remote_output_dir, filename)):
+        copyfile(os.path.join(remote_output_dir, filename), local_filepath)
+        return True
+    return False
+
+
+def _get_node_user_items(user_items: List[Any]) -> List[Any]:
+    """Returns the slice of the items associated to the current node."""
     num_nodes = _get_num_nodes()
-    current_node_rank = _get_node_rank()
+    node_rank = _get_node_rank()
+    if not 0 <= node_rank < num_nodes:
+        raise RuntimeError(f"The current_node_rank {node_rank} doesn't exist in {num_nodes}.")
     node_size = len(user_items) // num_nodes
-    workers_user_items = []
-    begins = []
-    for node_rank in range(num_nodes):
-        if node_rank != current_node_rank:
-            continue
-        is_last_node = node_rank == num_nodes - 1
-        start_node = node_rank * node_size
-        end_node = len(user_items) if is_last_node else (node_rank + 1) * node_size
-        node_user_items = user_items[start_node:end_node]
-        worker_size = len(node_user_items) // num_workers
-        for worker_idx in range(num_workers):
-            is_last = worker_idx == num_workers - 1
-            begin = worker_idx * worker_size
-            end = len(node_user_items) if is_last else (worker_idx + 1) * worker_size
-            workers_user_items.append(node_user_items[begin:end])
-            begins.append(begin)
-        return begins, workers_user_items
-    raise RuntimeError(f"The current_node_rank {current_node_rank} doesn't exist in {num_nodes}.")
+    is_last_node = node_rank == num_nodes - 1
+    start_node = node_rank * node_size
+    end_node = len(user_items) if is_last_node else (node_rank + 1) * node_size
+    return user_items[start_node:end_node]
+
+
+def _get_split_begins(num_splits: int, num_items: int, costs: Optional[List[float]] = None) -> List[int]:
+    """Returns where each of the contiguous splits of the items begins.
+
+    Without ``costs``, the splits have the same number of items and the last one gets the remainder. Otherwise, the
+    splits are balanced so their items have about the same total cost.
+
+    """
+    if costs is None or sum(costs) <= 0:
+        split_size = num_items // num_splits
+        return [split_idx * split_size for split_idx in range(num_splits)]
+
+    # Each split begins at the item boundary closest to the share of the total cost of the previous splits.
+    cumulative_costs = np.concatenate([[0.0], np.cumsum(costs)])
+    targets = cumulative_costs[-1] * np.arange(1, num_splits) / num_splits
+    after = np.searchsorted(cumulative_costs, targets, side="left")
+    before = after - 1
+    begins = np.where(cumulative_costs[after] - targets < targets - cumulative_costs[before], after, before)
+    return [0] + begins.tolist()
+
+
+def _associated_items_to_workers(
+    num_workers: int, user_items: List[Any], item_cost: Optional[Callable[[Any], float]] = None
+) -> Tuple[List[int], List[List[Any]]]:
+    # Associate the items to the workers based on number of nodes and node rank.
+    node_user_items = _get_node_user_items(user_items)
+    costs = [item_cost(item) for item in node_user_items] if item_cost else None
+    begins = _get_split_begins(num_workers, len(node_user_items), costs)
+    ends = begins[1:] + [len(node_user_items)]
+    workers_user_items = [node_user_items[begin:end] for begin, end in zip(begins, ends)]
+    return begins, workers_user_items
+
+
+def _associated_items_to_work_units(
+    num_workers: int,
+    node_user_items: List[Any],
+    item_cost: Optional[Callable[[Any], float]] = None,
+    num_units_per_worker: int = _DEFAULT_WORK_UNITS_PER_WORKER,
+) -> List[Tuple[int, List[Any]]]:
+    """Split the items of the current node into contiguous work units, pulled by the workers from a shared queue.
+
+    The chunks are written per work unit, so the chunk layout doesn't depend on which worker processes which unit.
+    The units are returned in the order they should be processed, the most expensive ones first.
+
+    Returns:
+        The list of ``(unit_index, items)`` of the node.
+
+    """
+    num_units = max(min(num_workers * num_units_per_worker, len(node_user_items)), 1)
+    costs = [item_cost(item) for item in node_user_items] if item_cost else [1.0] * len(node_user_items)
+
+    begins = _get_split_begins(num_units, len(node_user_items), costs)
+    ends = begins[1:] + [len(node_user_items)]
+    # The unit indexes are unique across the nodes, as they name the chunks.
+    first_unit_index = _get_node_rank() * num_workers * num_units_per_worker
+    work_units = [
+        (sum(costs[begin:end]), first_unit_index + unit_idx, node_user_items[begin:end])
+        for unit_idx, (begin, end) in enumerate(zip(begins, ends))
+        if begin < end
+    ]
+
+    # Longest processing time first, so the cheap units fill the gaps at the end of the run.
+    work_units.sort(key=lambda work_unit: (-work_unit[0], work_unit[1]))
+    return [(unit_index, items) for _, unit_index, items in work_units]
 
 
 class BaseWorker:
@@ -241,8 +447,20 @@ class BaseWorker:
         stop_queue: Queue,
         num_downloaders: int,
         remove: bool,
+        work_queue: Optional[Queue] = None,
+        num_work_units: int = 0,
+        rank_offset: int = 0,
+        resume: bool = False,
     ) -> None:
-        """The BaseWorker is responsible to process the user data."""
+        """The BaseWorker is responsible to process the user data.
+
+        When a ``work_queue`` is provided, the worker pulls ``(unit_index, items)`` work units from it until it
+        receives ``None`` instead of processing its own ``items``.
+
+        The chunks are written with a rank shifted by ``rank_offset``. With ``resume``, the chunks recorded in the
+        manifest of the rank by an interrupted run are kept and their items are skipped.
+
+        """
         self.worker_index = worker_index
         self.num_workers = num_workers
         self.start_index = start_index
@@ -256,6 +474,10 @@ class BaseWorker:
         self.num_items = len(self.items)
         self.num_downloaders = num_downloaders
         self.remove = remove
+        self.work_queue = work_queue
+        self.num_work_units = num_work_units
+        self.rank_offset = rank_offset
+        self.resume = resume
         self.paths: List[List[str]] = []
         self.remover: Optional[Process] = None
         self.downloaders: List[Process] = []
@@ -263,7 +485,7 @@ class BaseWorker:
         self.stop_queue = stop_queue
         self.ready_to_process_queue: Queue = Queue()
         self.remove_queue: Queue = Queue()
-        self.upload_queue: Queue = Queue()
+        self.upload_queue: Queue = Queue(maxsize=_MAX_PENDING_UPLOADS)
         self.progress_queue: Queue = progress_queue
         self.error_queue: Queue = error_queue
         self.uploader: Optional[Process] = None
@@ -272,6 +494,15 @@ class BaseWorker:
         self._last_time = time()
         self._index_counter = 0
         self._current_item: Any = None
+        # The position of the first item of the rank in `items`, the data index where the current item begins and
+        # the number of its data already written by an interrupted run.
+        self._rank_items_begin = 0
+        self._item_begin = 0
+        self._num_data_to_skip = 0
+        self._skipped_data: Dict[int, int] = {}
+        self._start_item = 0
+        self._num_recorded_chunks = 0
+        self._uploaded_files: Set[str] = set()
 
     def run(self) -> None:
         try:
@@ -287,11 +518,19 @@ class BaseWorker:
         self._set_environ_variables()
         self._create_cache()
         self._collect_paths()
-        self._start_downloaders()
         self._start_uploader()
         self._start_remover()
+        if self.resume:
+            self._uploaded_files = _read_uploaded_files(self.cache_chunks_dir)
+            if isinstance(self.data_recipe, DataChunkRecipe) and self.work_queue is None:
+                self._start_item = self._counter = self._resume_writer()
+        self._start_downloaders()
 
     def _loop(self) -> None:
+        if self.work_queue is not None:
+            self._loop_over_work_units()
+            return
+
         num_downloader_finished = 0
 
         while True:
@@ -302,47 +541,95 @@ class BaseWorker:
                 if num_downloader_finished == self.num_downloaders:
                     if isinstance(self.data_recipe, DataChunkRecipe):
                         self._handle_data_chunk_recipe_end()
+                    self._terminate()
+                    return
+                continue
 
-                    if self.remote_output_dir:
-                        assert self.uploader
-                        self.upload_queue.put(None)
-                        self.uploader.join()
+            # Don't send the last progress update, so the main thread awaits for the uploader and remover
+            if self._process_index(index, report=self._counter < (self.num_items - 3)):
+                return
 
-                    if self.remove:
-                        assert self.remover
-                        self.remove_queue.put(None)
-                        self.remover.join()
+    def _loop_over_work_units(self) -> None:
+        assert self.work_queue is not None
 
-                    if self.progress_queue:
-                        self.progress_queue.put((self.worker_index, self._counter))
-                    return
-                continue
+        try:
+            while True:
+                work_unit: Optional[Tuple[int, List[Any]]] = self.work_queue.get()
+                if work_unit is None:
+                    break
 
-            if isinstance(self.data_recipe, DataChunkRecipe):
-                self._handle_data_chunk_recipe(index)
-            else:
-                self._handle_data_transform_recipe(index)
+                unit_index, items = work_unit
+                begin = len(self.items)
+                self._collect_paths(items)
+
+                start_item = 0
+                if isinstance(self.data_recipe, DataChunkRecipe):
+                    self._create_work_unit_cache(unit_index)
+                    self._rank_items_begin = begin
+                    if self.resume:
+                        start_item = self._resume_writer()
+                        self._counter += start_item
+
+                for index in range(begin + start_item, len(self.items)):
+                    self.to_download_queues[index % self.num_downloaders].put((index, self.paths[index]))
+
+                for remaining in reversed(range(len(items) - start_item)):
+                    index = self.ready_to_process_queue.get()
+                    # Don't send the progress update of the last item of a unit, as it might be the last of the run
+                    if self._process_index(index, report=remaining > 0):
+                        return
+                    self.items[index] = None
+
+                if isinstance(self.data_recipe, DataChunkRecipe):
+                    self._handle_data_chunk_recipe_end()
+        finally:
+            # The downloaders wait for more paths until they're stopped, even when the processing failed.
+            self._stop_downloaders()
+
+        self._terminate()
+
+    def _process_index(self, index: int, report: bool) -> bool:
+        """Process the item at the given index and returns whether the worker was asked to stop."""
+        if isinstance(self.data_recipe, DataChunkRecipe):
+            self._handle_data_chunk_recipe(index)
+        else:
+            self._handle_data_transform_recipe(index)
 
-            self._counter += 1
+        self._counter += 1
 
-            # Don't send the last progress update, so the main thread awaits for the uploader and remover
-            if self.progress_queue and (time() - self._last_time) > 1 and self._counter < (self.num_items - 2):
-                self.progress_queue.put((self.worker_index, self._counter))
-                self._last_time = time()
+        if self.progress_queue and (time() - self._last_time) > 1 and report:
+            self.progress_queue.put((self.worker_index, self._counter))
+            self._last_time = time()
 
-            if self.remove:
-                self.remove_queue.put(self.paths[index])
+        if self.remove:
+            self.remove_queue.put(self.paths[index])
 
-            try:
-                self.stop_queue.get(timeout=0.0001)
-                return
-            except Empty:
-                pass
+        try:
+            self.stop_queue.get(timeout=0.0001)
+            return True
+        except Empty:
+            return False
+
+    def _terminate(self) -> None:
+        """Wait for the uploader and the remover to finish, then send the final progress update."""
+        if self.remote_output_dir:
+            assert self.uploader
+            self._put_upload(None)
+            self.uploader.join()
+
+        if self.remove:
+            assert self.remover
+            self.remove_queue.put(None)
+            self.remover.join()
+
+        if self.progress_queue:
+            self.progress_queue.put((self.worker_index, self._counter))
 
     def _set_environ_variables(self) -> None:
         # set the optimizer global rank and world_size
-        os.environ["DATA_OPTIMIZER_GLOBAL_RANK"] = str(_get_node_rank() * self.num_workers + self.worker_index)
-        os.environ["DATA_OPTIMIZER_NUM_WORKERS"] = str(self.num_workers)
+        os.environ["DATA_OPTIMIZER_GLOBAL_RANK"] = str(self._get_rank())
+        # With the dynamic scheduling, each work unit writes its own index.
+        os.environ["DATA_OPTIMIZER_NUM_WORKERS"] = str(self.num_work_units if self.work_queue else self.num_workers)
 
     def _create_cache(self) -> None:
         self.cache_data_dir = _get_cache_data_dir(self.dataset_name)
@@ -351,7 +638,8 @@ class BaseWorker:
         self.cache_chunks_dir = _get_cache_dir(self.dataset_name)
         os.makedirs(self.cache_chunks_dir, exist_ok=True)
 
-        if isinstance(self.data_recipe, DataTransformRecipe):
+        # With the dynamic scheduling, a cache is created for each work unit instead.
+        if isinstance(self.data_recipe, DataTransformRecipe) or self.work_queue is not None:
             return
 
         self.cache = Cache(
@@ -360,18 +648,107 @@ class BaseWorker:
             chunk_size=self.data_recipe.chunk_size,
             compression=self.data_recipe.compression,
         )
-        self.cache._reader._rank = _get_node_rank() * self.num_workers + self.worker_index
+        self.cache._reader._rank = self._get_rank()
+
+    def _get_rank(self) -> int:
+        return self.rank_offset + _get_node_rank() * self.num_workers + self.worker_index
+
+    def _create_work_unit_cache(self, unit_index: int) -> None:
+        """Create the cache writing the chunks of a work unit, named after the unit instead of the worker."""
+        self.cache = Cache(
+            self.cache_chunks_dir,
+            chunk_bytes=self.data_recipe.chunk_bytes,
+            chunk_size=self.data_recipe.chunk_size,
+            compression=self.data_recipe.compression,
+        )
+        self.cache._writer._rank = unit_index
+        self.cache._reader._rank = unit_index
+        self._index_counter = 0
+        self._num_recorded_chunks = 0
+
+    def _get_manifest_filepath(self) -> str:
+        return os.path.join(self.cache_chunks_dir, f"{self.cache._writer.rank}.{_MANIFEST_SUFFIX}")
+
+    def _resume_writer(self) -> int:
+        """Restore the chunks recorded in the manifest of the rank by an interrupted run.
+
+        The chunks are kept up to the first one neither available locally nor uploaded. Returns the number of items of
+        the rank whose data were all written. The data of the following item already written are skipped.
+
+        """
+        kept = []
+        for record in _read_manifest(self._get_manifest_filepath()):
+            filename = record["chunk"]["filename"]
+            if filename not in self._uploaded_files and not os.path.exists(
+                os.path.join(self.cache_chunks_dir, filename)
+            ):
+                break
+            kept.append(record)
+
+        # Remove the chunks written after the last recorded one, they're written again
+        kept_filenames = {record["chunk"]["filename"] for record in kept}
+        prefix = f"chunk-{self.cache._writer.rank}-"
+        for filename in os.listdir(self.cache_chunks_dir):
+            if filename.startswith(prefix) and filename not in kept_filenames:
+                os.remove(os.path.join(self.cache_chunks_dir, filename))
+
+        with open(self._get_manifest_filepath(), "w") as f:
+            f.writelines(f"{json.dumps(record)}\n" for record in kept)
+        self._num_recorded_chunks = len(kept)
+
+        if not kept:
+            return 0
+
+        self.cache._writer.resume([record["chunk"] for record in kept], kept[-1]["config"])
+        self._index_counter = sum(record["chunk"]["chunk_size"] for record in kept)
+
+        # Upload the chunks the interrupted run didn't
+        for filename in kept_filenames - self._uploaded_files:
+            self._try_upload(os.path.join(self.cache_chunks_dir, filename))
+
+        item, skip = kept[-1]["item"], kept[-1]["skip"]
+        if skip:
+            self._skipped_data[self._rank_items_begin + item] = skip
+        return item
+
+    def _record_chunks(self, item: int, skip: int) -> None:
+        """Record the chunks written since the last call in the manifest of the rank.
+
+        An interrupted run resumes after the last chunk from the given ``item``, skipping its first ``skip`` data.
+
+        """
+        writer = self.cache._writer
+        config = writer.get_config()
+        with open(self._get_manifest_filepath(), "a") as f:
+            for chunk in writer._chunks_info[self._num_recorded_chunks :]:
+                f.write(f"{json.dumps({'chunk': chunk, 'item': item, 'skip': skip, 'config': config})}\n")
+        self._num_recorded_chunks = len(writer._chunks_info)
 
     def _try_upload(self, filepath: Optional[str]) -> None:
         if not filepath or self.remote_output_dir is None:
             return
 
         assert os.path.exists(filepath), filepath
-        self.upload_queue.put(filepath)
+        self._put_upload(filepath)
 
-    def _collect_paths(self) -> None:
+    def _put_upload(self, filepath: Optional[str]) -> None:
+        """Queue a file for upload, waiting while the uploader is behind."""
+        while True:
+            try:
+                self.upload_queue.put(filepath, timeout=1)
+                return
+            except Full:
+                if self.uploader is not None and not self.uploader.is_alive():
+                    raise RuntimeError("The uploader process terminated unexpectedly.")
+
+    def _collect_paths(self, new_items: Optional[List[Any]] = None) -> None:
+        """Collect the paths of the items and point them to the cache data directory.
+
+        When ``new_items`` are provided, they're appended to the items of the worker.
+
+        """
         items = []
-        for item in self.items:
+        for item in self.items if new_items is None else new_items:
             flattened_item, spec = tree_flatten(item)
 
             # For speed reasons, we assume starting with `self.input_dir` is enough to be a real file.
@@ -401,7 +778,10 @@ class BaseWorker:
             items.append(tree_unflatten(flattened_item, spec))
             self._collected_items += 1
 
-        self.items = items
+        if new_items is None:
+            self.items = items
+        else:
+            self.items.extend(items)
 
     def _start_downloaders(self) -> None:
         for _ in range(self.num_downloaders):
@@ -420,9 +800,16 @@ class BaseWorker:
             self.downloaders.append(p)
             self.to_download_queues.append(to_download_queue)
 
-        for index, paths in enumerate(self.paths):
-            self.to_download_queues[index % self.num_downloaders].put((index, paths))
+        # With the dynamic scheduling, the paths are sent as the work units are pulled.
+        if self.work_queue is not None:
+            return
+
+        for index in range(self._start_item, len(self.paths)):
+            self.to_download_queues[index % self.num_downloaders].put((index, self.paths[index]))
+
+        self._stop_downloaders()
 
+    def _stop_downloaders(self) -> None:
         for downloader_index in range(self.num_downloaders):
             self.to_download_queues[downloader_index].put(None)
 
@@ -449,6 +836,7 @@ class BaseWorker:
                 self.remove_queue,
                 self.cache_chunks_dir,
                 self.remote_output_dir,
+                os.path.join(self.cache_chunks_dir, f"{self.node_rank}-{self.worker_index}.{_UPLOADED_SUFFIX}"),
             ),
         )
         self.uploader.start()
@@ -456,27 +844,39 @@ class BaseWorker:
     def _handle_data_chunk_recipe(self, index: int) -> None:
         try:
             self._current_item = self.items[index]
+            self._num_data_to_skip = self._skipped_data.pop(index, 0)
+            self._item_begin = self._index_counter - self._num_data_to_skip
             item_data_or_generator = self.data_recipe.prepare_item(self._current_item)
             if isinstance(item_data_or_generator, types.GeneratorType):
                 for item_data in item_data_or_generator:
                     if item_data is not None:
-                        chunk_filepath = self.cache._add_item(self._index_counter, item_data)
-                        self._try_upload(chunk_filepath)
-                        self._index_counter += 1
+                        self._add_item_data(index, item_data)
             elif item_data_or_generator is not None:
-                chunk_filepath = self.cache._add_item(self._index_counter, item_data_or_generator)
-                self._try_upload(chunk_filepath)
-                self._index_counter += 1
+                self._add_item_data(index, item_data_or_generator)
         except Exception as e:
             raise RuntimeError(f"Failed processing {self._current_item}") from e
 
+    def _add_item_data(self, index: int, item_data: Any) -> None:
+        # The data written by an interrupted run are skipped
+        if self._num_data_to_skip:
+            self._num_data_to_skip -= 1
+            return
+
+        chunk_filepath = self.cache._add_item(self._index_counter, item_data)
+        self._try_upload(chunk_filepath)
+        if chunk_filepath:
+            # The chunk ends before the data being added, so its item needs to be processed again on resume
+            self._record_chunks(index - self._rank_items_begin, self._index_counter - self._item_begin)
+        self._index_counter += 1
+
     def _handle_data_chunk_recipe_end(self) -> None:
         chunks_filepaths = self.cache.done()
 
         if chunks_filepaths:
             for chunk_filepath in chunks_filepaths:
                 if isinstance(chunk_filepath, str) and os.path.exists(chunk_filepath):
-                    self.upload_queue.put(chunk_filepath)
+                    self._put_upload(chunk_filepath)
+            self._record_chunks(len(self.items) - self._rank_items_begin, 0)
 
     def _handle_data_transform_recipe(self, index: int) -> None:
         # Don't use a context manager to avoid deleting files that are being uploaded.
@@ -585,6 +985,11 @@ class DataChunkRecipe(DataRecipe):
         if chunks and delete_cached_files and remote_output_dir:
             raise RuntimeError(f"All the chunks should have been deleted. Found {chunks}")
 
+        # The index of the dataset the new items are appended to is merged first.
+        base_index_filepath = os.path.join(cache_dir, _BASE_INDEX_FILENAME)
+        if os.path.exists(base_index_filepath):
+            os.replace(base_index_filepath, os.path.join(cache_dir, f"base.{_BINARY_INDEX_FILENAME}"))
+
         merge_cache = Cache(cache_dir, chunk_bytes=1)
         node_rank = _get_node_rank()
         merge_cache._merge_no_wait(node_rank if num_nodes > 1 else None)
@@ -597,9 +1002,9 @@ class DataChunkRecipe(DataRecipe):
 
         obj = parse.urlparse(remote_output_dir)
         if num_nodes > 1:
-            local_filepath = os.path.join(cache_dir, f"{node_rank}-{_INDEX_FILENAME}")
+            local_filepath = os.path.join(cache_dir, f"{node_rank}-{_BINARY_INDEX_FILENAME}")
         else:
-            local_filepath = os.path.join(cache_dir, _INDEX_FILENAME)
+            local_filepath = os.path.join(cache_dir, _BINARY_INDEX_FILENAME)
 
         if obj.scheme == "s3":
             s3 = _get_s3_client()
@@ -618,7 +1023,7 @@ class DataChunkRecipe(DataRecipe):
         if num_nodes == node_rank + 1:
             # Get the index file locally
             for node_rank in range(num_nodes - 1):
-                remote_filepath = os.path.join(remote_output_dir, f"{node_rank}-{_INDEX_FILENAME}")
+                remote_filepath = os.path.join(remote_output_dir, f"{node_rank}-{_BINARY_INDEX_FILENAME}")
                 node_index_filepath = os.path.join(cache_dir, os.path.basename(remote_filepath))
                 if obj.scheme == "s3":
                     obj = parse.urlparse(remote_filepath)
@@ -660,6 +1065,10 @@ class DataProcessor:
         remote_input_dir: Optional[str] = None,
         remote_output_dir: Optional[str] = None,
         random_seed: Optional[int] = 42,
+        dynamic_scheduling: bool = False,
+        item_cost: Optional[Callable[[Any], float]] = None,
+        resume: bool = False,
+        append: bool = False,
     ):
         """The `DatasetOptimiser` provides an efficient way to process data across multiple machine into chunks to make
         training faster.
@@ -674,6 +1083,15 @@ class DataProcessor:
             remote_input_dir: The remote folder where the data are.
             remote_output_dir: The remote folder where the optimised data will be stored.
             random_seed: The random seed to be set before shuffling the data.
+            dynamic_scheduling: Whether the workers pull contiguous work units from a shared queue instead of
+                processing a fixed slice of the items each, so the fast workers take over the work of the slow ones.
+                The chunks are named after the work units, so their layout doesn't depend on the scheduling.
+            item_cost: A function returning the estimated processing cost of an item, e.g. its file size. When
+                provided, the items are split into slices or work units of about the same total cost.
+            resume: Whether to resume an interrupted run from the chunks recorded in the manifests of its cache
+                directory, instead of processing all the items again. The items and the workers shouldn't change.
+            append: Whether to append the new items returned by the recipe to the dataset optimized by a previous
+                run, assuming the items are only ever appended to. The new chunks are merged into the existing index.
 
         """
         self.name = name
@@ -686,6 +1104,7 @@ class DataProcessor:
         self.src_resolver = src_resolver or _LightningSrcResolver()
         self.dst_resolver = _LightningTargetResolver()
         self.workers_tracker: Dict[int, int] = {}
+        self.workers_durations: Dict[int, float] = {}
         self.progress_queue: Optional[Queue] = None
         self.error_queue: Queue = Queue()
         self.stop_queues: List[Queue] = []
@@ -706,6 +1125,10 @@ class DataProcessor:
             print(f"Storing the files under {self.remote_output_dir}")
 
         self.random_seed = random_seed
+        self.dynamic_scheduling = dynamic_scheduling
+        self.item_cost = item_cost
+        self.resume = resume
+        self.append = append
 
     def run(self, data_recipe: DataRecipe) -> None:
         """The `DataProcessor.run(...)` method triggers the data recipe processing over your dataset."""
@@ -727,18 +1150,50 @@ class DataProcessor:
         if not isinstance(user_items, list):
             raise ValueError("The setup_fn should return a list of item metadata.")
 
-        # Associate the items to the workers based on num_nodes and node_rank
-        begins, workers_user_items = _associated_items_to_workers(self.num_workers, user_items)
-        print(f"Setup finished in {round(time() - t0, 3)} seconds. Found {len(user_items)} items to process.")
+        if (self.resume or self.append) and not isinstance(data_recipe, DataChunkRecipe):
+            raise ValueError("Resuming or appending to a dataset is only supported with a `DataChunkRecipe`.")
+
+        # Skip the items of the dataset the new items are appended to
+        manifest = self._get_manifest(len(user_items))
+        if manifest["done"]:
+            print(f"The dataset `{self.name}` was already optimized. Nothing to resume.")
+            return
+        num_new_items = len(user_items) - manifest["items_offset"]
+        if num_new_items <= 0:
+            print(f"The dataset `{self.name}` contains all the {len(user_items)} items. Nothing to append.")
+            return
+        user_items = user_items[manifest["items_offset"] :]
 
         if self.fast_dev_run:
             items_to_keep = self.fast_dev_run if isinstance(self.fast_dev_run, int) else _DEFAULT_FAST_DEV_RUN_ITEMS
-            workers_user_items = [w[:items_to_keep] for w in workers_user_items]
-            print(f"Fast dev run is enabled. Limiting to {items_to_keep} items per process.")
 
-        num_items = sum([len(items) for items in workers_user_items])
+        # Associate the items to the workers based on num_nodes and node_rank
+        work_units: Optional[List[Tuple[int, List[Any]]]] = None
+        if self.dynamic_scheduling:
+            node_user_items = _get_node_user_items(user_items)
+            if self.fast_dev_run:
+                node_user_items = node_user_items[: items_to_keep * self.num_workers]
+            work_units = [
+                (manifest["rank_offset"] + unit_index, items)
+                for unit_index, items in _associated_items_to_work_units(
+                    self.num_workers, node_user_items, self.item_cost
+                )
+            ]
+            begins, workers_user_items = [0] * self.num_workers, [[] for _ in range(self.num_workers)]
+            num_items = len(node_user_items)
+        else:
+            begins, workers_user_items = _associated_items_to_workers(self.num_workers, user_items, self.item_cost)
+            if self.fast_dev_run:
+                workers_user_items = [w[:items_to_keep] for w in workers_user_items]
+            num_items = sum([len(items) for items in workers_user_items])
+
+        print(f"Setup finished in {round(time() - t0, 3)} seconds. Found {len(user_items)} items to process.")
+        if self.fast_dev_run:
+            print(f"Fast dev run is enabled. Limiting to {items_to_keep} items per process.")
 
         self._cleanup_cache()
+        if isinstance(data_recipe, DataChunkRecipe):
+            self._prepare_manifest(manifest)
 
         print(f"Starting {self.num_workers} workers")
 
@@ -748,9 +1203,10 @@ class DataProcessor:
 
         signal.signal(signal.SIGINT, self._signal_handler)
 
-        self._create_process_workers(data_recipe, begins, workers_user_items)
+        self._create_process_workers(data_recipe, begins, workers_user_items, work_units, manifest["rank_offset"])
 
         print("Workers are ready ! Starting data processing...")
+        t1 = time()
 
         current_total = 0
         with tqdm(total=num_items, smoothing=0, position=-1, mininterval=1) as pbar:
@@ -765,6 +1221,7 @@ class DataProcessor:
                     except Empty:
                         continue
                     self.workers_tracker[index] = counter
+                    self.workers_durations[index] = time() - t1
                     new_total = sum(self.workers_tracker.values())
                 pbar.update(new_total - current_total)
                 current_total = new_total
@@ -779,7 +1236,11 @@ class DataProcessor:
                 w.join(0)
 
         print("Workers are finished.")
+        self._print_workers_throughput()
         data_recipe._done(self.delete_cached_files, self.remote_output_dir)
+        if isinstance(data_recipe, DataChunkRecipe):
+            is_last_node = num_nodes == 1 or _get_node_rank() == num_nodes - 1
+            self._save_manifest({**manifest, "done": True}, upload=is_last_node)
         print("Finished data processing!")
 
     def _exit_on_error(self, error: str) -> None:
@@ -787,10 +1248,33 @@ class DataProcessor:
             w.join(0)
         raise RuntimeError(f"We found the following error {error}.")
 
+    def _print_workers_throughput(self) -> None:
+        """Report the throughput of each worker, measured until its last progress update."""
+        for index in sorted(self.workers_tracker):
+            counter = self.workers_tracker[index]
+            duration = self.workers_durations[index]
+            throughput = counter / duration if duration > 0 else float("inf")
+            print(f"Worker {index} processed {counter} items in {duration:.2f} seconds ({throughput:.2f} items/s).")
+
     def _create_process_workers(
-        self, data_recipe: DataRecipe, begins: List[int], workers_user_items: List[List[Any]]
+        self,
+        data_recipe: DataRecipe,
+        begins: List[int],
+        workers_user_items: List[List[Any]],
+        work_units: Optional[List[Tuple[int, List[Any]]]] = None,
+        rank_offset: int = 0,
     ) -> None:
         self.progress_queue = Queue()
+
+        # With the dynamic scheduling, all the workers pull the work units from a shared queue.
+        work_queue: Optional[Queue] = None
+        if work_units is not None:
+            work_queue = Queue()
+            for work_unit in work_units:
+                work_queue.put(work_unit)
+            for _ in range(self.num_workers):
+                work_queue.put(None)
+
         workers: List[DataWorkerProcess] = []
         stop_queues: List[Queue] = []
         for worker_idx, worker_user_items in enumerate(workers_user_items):
@@ -811,6 +1295,10 @@ class DataProcessor:
                 stop_queues[-1],
                 self.num_downloaders,
                 self.delete_cached_files,
+                work_queue,
+                len(work_units or []),
+                rank_offset,
+                self.resume,
             )
             worker.start()
             workers.append(worker)
@@ -851,14 +1339,103 @@ class DataProcessor:
             w.join(0)
         os._exit(0)
 
+    def _get_manifest(self, num_items: int) -> Dict[str, Any]:
+        """Returns the manifest of the run, describing which items are processed and the ranks writing them."""
+        num_nodes = _get_num_nodes()
+        run = {"num_items": num_items, "num_nodes": num_nodes, "num_workers": self.num_workers}
+        run["dynamic_scheduling"] = self.dynamic_scheduling
+
+        filepath = os.path.join(_get_cache_dir(self.name), _DATASET_MANIFEST_FILENAME)
+        if self.resume and os.path.exists(filepath):
+            with open(filepath) as f:
+                manifest = json.load(f)
+            # The new items of a finished run are appended by a new run instead
+            if not (self.append and manifest["done"]):
+                for key, value in run.items():
+                    if manifest[key] != value:
+                        raise ValueError(
+                            f"The run can't be resumed as its {key} changed from {manifest[key]} to {value}."
+                        )
+                return manifest
+
+        items_offset = rank_offset = 0
+        if self.append:
+            previous_manifest = self._load_dataset_manifest()
+            items_offset, rank_offset = previous_manifest["num_items"], previous_manifest["num_ranks"]
+
+        num_ranks_per_node = self.num_workers * (_DEFAULT_WORK_UNITS_PER_WORKER if self.dynamic_scheduling else 1)
+        return {
+            **run,
+            "items_offset": items_offset,
+            "rank_offset": rank_offset,
+            "num_ranks": rank_offset + num_nodes * num_ranks_per_node,
+            "done": False,
+        }
+
+    def _load_dataset_manifest(self) -> Dict[str, Any]:
+        """Load the manifest of the dataset the new items are appended to."""
+        cache_dir = _get_cache_dir(self.name)
+        filepath = os.path.join(cache_dir, _DATASET_MANIFEST_FILENAME)
+        if self.remote_output_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            found = _download_file(self.remote_output_dir, _DATASET_MANIFEST_FILENAME, filepath)
+        else:
+            found = os.path.exists(filepath)
+
+        if not found:
+            raise FileNotFoundError(
+                f"The dataset `{self.name}` can't be appended to as its manifest `{_DATASET_MANIFEST_FILENAME}` wasn't"
+                " found. Only the datasets optimized with this version of the DataProcessor can be appended to."
+            )
+
+        with open(filepath) as f:
+            manifest = json.load(f)
+        if not manifest["done"]:
+            raise RuntimeError(f"The dataset `{self.name}` can't be appended to as its optimization didn't finish.")
+        return manifest
+
+    def _prepare_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Save the manifest of the run and fetch the index of the dataset the new items are appended to."""
+        cache_dir = _get_cache_dir(self.name)
+        base_index_filepath = os.path.join(cache_dir, _BASE_INDEX_FILENAME)
+
+        # The chunks of the dataset are merged with the new ones by the first node
+        is_new_run = not os.path.exists(os.path.join(cache_dir, _DATASET_MANIFEST_FILENAME)) or not self.resume
+        if manifest["items_offset"] and is_new_run and _get_node_rank() == 0:
+            if self.remote_output_dir:
+                _download_file(self.remote_output_dir, _BINARY_INDEX_FILENAME, base_index_filepath)
+            else:
+                os.replace(os.path.join(cache_dir, _BINARY_INDEX_FILENAME), base_index_filepath)
+
+        self._save_manifest(manifest, upload=False)
+
+    def _save_manifest(self, manifest: Dict[str, Any], upload: bool) -> None:
+        filepath = os.path.join(_get_cache_dir(self.name), _DATASET_MANIFEST_FILENAME)
+        with open(filepath + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(filepath + ".tmp", filepath)
+
+        if upload and self.remote_output_dir:
+            _upload_file(filepath, self.remote_output_dir)
+
     def _cleanup_cache(self) -> None:
         cache_dir = _get_cache_dir(self.name)
 
         # Cleanup the cache dir folder to avoid corrupted files from previous run to be there.
-        if os.path.exists(cache_dir):
-            rmtree(cache_dir)
+        # When resuming or appending without remote output dir, the chunks written previously are kept instead.
+        if self.resume or (self.append and not self.remote_output_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+            # The indexes are written again by the workers, and merged with the dataset ones.
+            for filename in os.listdir(cache_dir):
+                if filename.endswith((_INDEX_FILENAME, _BINARY_INDEX_FILENAME)) and (
+                    not self.append or filename != _BINARY_INDEX_FILENAME
+                ):
+                    os.remove(os.path.join(cache_dir, filename))
+        else:
+            if os.path.exists(cache_dir):
+                rmtree(cache_dir)
 
-        os.makedirs(cache_dir, exist_ok=True)
+            os.makedirs(cache_dir, exist_ok=True)
 
         cache_data_dir = _get_cache_data_dir(self.name)
 
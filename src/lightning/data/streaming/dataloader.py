@@ -16,7 +16,7 @@ import inspect
 import logging
 import os
 from importlib import reload
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 import torch
 from torch.utils.data import Dataset, IterableDataset
@@ -34,6 +34,7 @@ from torch.utils.data.sampler import BatchSampler, Sampler
 from lightning.data.datasets.env import _DistributedEnv
 from lightning.data.streaming import Cache
 from lightning.data.streaming.constants import _DEFAULT_CHUNK_BYTES, _TORCH_GREATER_EQUAL_2_1_0, _VIZ_TRACKER_AVAILABLE
+from lightning.data.streaming.dataset import StreamingDataset
 from lightning.data.streaming.sampler import CacheBatchSampler
 
 if _TORCH_GREATER_EQUAL_2_1_0:
@@ -279,6 +280,24 @@ class StreamingDataLoader(DataLoader):
                 "The StreamingDataLoader relies on its own internal sampler. Passing a batch_sampler isn't supported."
             )
 
+        self._profile = profile
+        self.current_epoch = 0
+        self._num_samples_yielded = 0
+
+        if isinstance(dataset, StreamingDataset):
+            # The StreamingDataset already handles the sharding, the shuffling and optionally the batching.
+            self._cache = None
+            super().__init__(
+                dataset,
+                *args,
+                batch_size=None if dataset.batch_size else batch_size or 1,
+                drop_last=False if dataset.batch_size else drop_last,
+                num_workers=num_workers,
+                collate_fn=collate_fn or default_collate,
+                **kwargs,
+            )
+            return
+
         if isinstance(dataset, IterableDataset):
             raise ValueError("Only map-based dataset are supported by the StreamingDataLoader for now.")
 
@@ -320,8 +339,6 @@ class StreamingDataLoader(DataLoader):
             cache,
         )
 
-        self._profile = profile
-
         super().__init__(
             dataset,
             *args,
@@ -331,8 +348,62 @@ class StreamingDataLoader(DataLoader):
             **kwargs,
         )
 
+    def __iter__(self) -> Iterator[Any]:
+        if not isinstance(self.dataset, StreamingDataset):
+            yield from super().__iter__()
+            return
+
+        if self.dataset._state_dict is None:
+            self._num_samples_yielded = 0
+        self.dataset.current_epoch = self.current_epoch
+        iterator = super().__iter__()
+        # The workers got their copy of the dataset, the resume state shouldn't apply to the next epochs.
+        self.dataset._state_dict = None
+
+        batch_size = self._streaming_batch_size
+        for batch in iterator:
+            self._num_samples_yielded += batch_size
+            yield batch
+
+        self.current_epoch += 1
+        self._num_samples_yielded = 0
+
+    def state_dict(self) -> Dict[str, Any]:
+        """Returns the state of the current epoch, used to resume the :class:`StreamingDataset` mid-epoch.
+
+        The position is tracked from the batches returned by the DataLoader. The batches already prefetched by the
+        workers aren't accounted for and would be read again after resuming. The state is empty for the other datasets.
+
+        """
+        if not isinstance(self.dataset, StreamingDataset):
+            return {}
+
+        return {
+            "dataset": self.dataset.state_dict(self._num_samples_yielded, self.num_workers, self._streaming_batch_size),
+            "current_epoch": self.current_epoch,
+            "num_samples_yielded": self._num_samples_yielded,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        """Loads a state returned by :meth:`state_dict`. It takes effect on the next call to ``iter()``."""
+        if not state_dict:
+            return
+        assert isinstance(self.dataset, StreamingDataset)
+
+        self.dataset.load_state_dict(state_dict["dataset"])
+        self.current_epoch = state_dict["current_epoch"]
+        self._num_samples_yielded = state_dict["num_samples_yielded"]
+
+    @property
+    def _streaming_batch_size(self) -> int:
+        """The number of samples contained in each batch returned by a worker."""
+        assert isinstance(self.dataset, StreamingDataset)
+        return self.dataset.batch_size or self.batch_size or 1
+
     def _get_iterator(self) -> "_BaseDataLoaderIter":
         """Overriden to ensure the `Cache.done()` method is triggered on iteration done."""
+        if isinstance(self.dataset, StreamingDataset):
+            return super()._get_iterator()
         if self.num_workers == 0:
             return _SingleProcessDataLoaderIterPatch(self)
         self.check_worker_number_rationality()
@@ -11,10 +11,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, List, Literal, Optional, Union
+import math
+from typing import Any, Dict, List, Literal, Optional, Union
 
 import numpy as np
 from torch.utils.data import IterableDataset
+from torch.utils.data._utils.collate import default_collate
 
 from lightning.data.datasets.env import _DistributedEnv, _WorkerEnv
 from lightning.data.streaming import Cache
@@ -35,6 +37,12 @@ class StreamingDataset(IterableDataset):
         shuffle: bool = False,
         drop_last: bool = False,
         seed: int = 42,
+        max_cache_size: Optional[Union[int, str]] = None,
+        max_pre_download: int = 2,
+        num_downloaders: int = 1,
+        batch_size: Optional[int] = None,
+        num_interleaved_chunks: int = 1,
+        range_read: bool = False,
     ) -> None:
         """The streaming dataset can be used once your data have been optimised using the DatasetOptimiser class.
 
@@ -47,13 +55,43 @@ class StreamingDataset(IterableDataset):
             drop_last: If `True`, drops the last items to ensure that
                 all processes/workers return the same amount of data.
             seed: Random seed for shuffling.
+            max_cache_size: The maximum size of the downloaded chunks kept on the local disk, e.g. ``"200GB"``.
+            max_pre_download: The maximum number of chunks downloaded ahead of the chunk being read.
+            num_downloaders: The number of chunks downloaded concurrently by each worker.
+            batch_size: When provided, the dataset yields collated batches of ``batch_size`` items read together.
+                Use it with ``DataLoader(..., batch_size=None)``.
+            num_interleaved_chunks: The number of consecutive chunks each worker reads at once. When shuffling, the
+                items are drawn at random across these chunks instead of one chunk at a time, which decorrelates the
+                batches from the chunk boundaries. The chunks are still downloaded in order, so ``max_pre_download``
+                and ``max_cache_size`` should leave room for ``num_interleaved_chunks`` chunks.
+            range_read: Whether to read the items from the remote chunks with byte range requests instead of
+                downloading the chunks. Only the offsets table of each chunk and the bytes of the requested items are
+                fetched, which suits random access to a few items, e.g. an evaluation subset.
 
         """
         super().__init__()
         if not isinstance(shuffle, bool):
             raise ValueError(f"Shuffle should be a boolean. Found {shuffle}")
 
-        self.cache = Cache(name=name, version=version, cache_dir=cache_dir, item_loader=item_loader, chunk_bytes=1)
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"The batch_size should be greater or equal to 1. Found {batch_size}")
+
+        if num_interleaved_chunks < 1:
+            raise ValueError(
+                f"The num_interleaved_chunks should be greater or equal to 1. Found {num_interleaved_chunks}"
+            )
+
+        self.cache = Cache(
+            name=name,
+            version=version,
+            cache_dir=cache_dir,
+            item_loader=item_loader,
+            chunk_bytes=1,
+            max_cache_size=max_cache_size,
+            max_pre_download=max_pre_download,
+            num_downloaders=num_downloaders,
+            range_read=range_read,
+        )
 
         self.cache._reader._try_load_config()
 
@@ -66,20 +104,32 @@ class StreamingDataset(IterableDataset):
             FullShuffle(self.cache, seed, drop_last) if shuffle else NoShuffle(self.cache, seed, drop_last)
         )
         self.drop_last = drop_last
+        self.batch_size = batch_size
+        self.num_interleaved_chunks = num_interleaved_chunks
         self.worker_env: Optional[_WorkerEnv] = None
         self.worker_chunks: List[int] = []
-        self.worker_intervals: List[List[int]] = []
+        self.worker_intervals: np.ndarray = np.zeros((0, 2), dtype=np.int64)
         self.current_indexes: List[int] = []
+        self.current_chunk_indexes: List[int] = []
+        # The position of the next item to read within the current indexes.
+        self.current_position = 0
         self.chunk_index = 0
+        self.first_chunk_index = 0
         self.index = 0
         self.has_triggered_download = False
         self.min_items_per_replica: Optional[int] = None
         self.seed = seed
         self.current_epoch = 0
         self.random_state = None
+        self._state_dict: Optional[Dict[str, Any]] = None
 
     def __len__(self) -> int:
-        return self.shuffle.get_len(self.distributed_env, self.current_epoch)
+        num_items = self.shuffle.get_len(self.distributed_env, self.current_epoch)
+        if self.batch_size is None:
+            return num_items
+        if self.drop_last:
+            return num_items // self.batch_size
+        return math.ceil(num_items / self.batch_size)
 
     def __iter__(self) -> "StreamingDataset":
         chunks_per_replica, intervals_per_replica = self.shuffle.get_chunks_and_intervals_per_ranks(
@@ -91,56 +141,165 @@ class StreamingDataset(IterableDataset):
         if self.worker_env is None:
             self.worker_env = _WorkerEnv.detect()
 
-        self.worker_chunks = []
-        self.worker_intervals = []
-
-        for i, (chunk_index, chunk_interval) in enumerate(zip(current_chunks, current_intervals)):
-            if i % self.worker_env.world_size != self.worker_env.rank:
-                continue
-            self.worker_chunks.append(chunk_index)
-            self.worker_intervals.append(chunk_interval)
+        # The chunks of the rank are associated to its workers in a round robin fashion.
+        self.worker_chunks = current_chunks[self.worker_env.rank :: self.worker_env.world_size]
+        self.worker_intervals = current_intervals[self.worker_env.rank :: self.worker_env.world_size]
 
+        self.shuffle.reset_random_state(self.current_epoch)
         self.current_indexes = []
+        self.current_chunk_indexes = []
+        self.current_position = 0
         self.chunk_index = 0
+        self.first_chunk_index = 0
         self.index = 0
+        self.has_triggered_download = False
+
+        if self._state_dict is not None:
+            self._resume(self._state_dict)
+            self._state_dict = None
 
         return self
 
+    def state_dict(self, num_samples_yielded: int, num_workers: int, batch_size: int) -> Dict[str, Any]:
+        """Returns the state required to resume the iteration mid-epoch.
+
+        As the state is typically taken from the main process, which doesn't have access to the workers, the position
+        of each worker is recovered from the number of samples yielded by the DataLoader of the current process.
+
+        Arguments:
+            num_samples_yielded: The number of samples yielded by the DataLoader in the current epoch.
+            num_workers: The number of workers of the DataLoader.
+            batch_size: The number of samples in each batch produced by a worker.
+
+        """
+        return {
+            "num_samples_yielded": num_samples_yielded,
+            "num_workers": num_workers,
+            "batch_size": batch_size,
+            "current_epoch": self.current_epoch,
+            "seed": self.seed,
+            "shuffle": isinstance(self.shuffle, FullShuffle),
+            "drop_last": self.drop_last,
+            "num_interleaved_chunks": self.num_interleaved_chunks,
+            "world_size": self.distributed_env.world_size,
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        """Loads a state returned by :meth:`state_dict`.
+
+        The state takes effect on the next call to ``iter()``: each worker skips the items it already yielded without
+        reading them.
+
+        """
+        current_state = {
+            "seed": self.seed,
+            "shuffle": isinstance(self.shuffle, FullShuffle),
+            "drop_last": self.drop_last,
+            "num_interleaved_chunks": self.num_interleaved_chunks,
+            "world_size": self.distributed_env.world_size,
+        }
+        for key, value in current_state.items():
+            if state_dict[key] != value:
+                raise ValueError(
+                    f"The provided `{key}` state value doesn't match the current one. Found {state_dict[key]} instead"
+                    f" of {value}. Resuming requires the same {', '.join(current_state)}."
+                )
+        self.current_epoch = state_dict["current_epoch"]
+        self._state_dict = state_dict
+
+    def _resume(self, state_dict: Dict[str, Any]) -> None:
+        """Move the current worker to the position it reached when the state was taken."""
+        assert self.worker_env
+        num_workers = max(state_dict["num_workers"], 1)
+        if num_workers != self.worker_env.world_size:
+            raise ValueError(
+                f"The state was taken with {num_workers} workers and can't be resumed with"
+                f" {self.worker_env.world_size}."
+            )
+
+        # The DataLoader fetches the batches from its workers in a round robin fashion.
+        batch_size = state_dict["batch_size"]
+        num_batches = state_dict["num_samples_yielded"] // batch_size
+        worker_num_batches = num_batches // num_workers + int(self.worker_env.rank < num_batches % num_workers)
+        items_to_skip = worker_num_batches * batch_size
+
+        # Skip the chunks already read entirely, without reading them.
+        while items_to_skip > 0 and self.chunk_index < len(self.worker_intervals):
+            # Shuffle the chunks to keep the random state consistent with the original iteration.
+            self._load_next_chunks()
+
+            num_items_skipped = min(items_to_skip, len(self.current_indexes))
+            self.current_position = num_items_skipped
+            self.index += num_items_skipped
+            items_to_skip -= num_items_skipped
+
     def __getitem__(self, index: Union[ChunkedIndex, int]) -> Any:
         if isinstance(index, int):
             index = ChunkedIndex(index, self.cache._get_chunk_index_from_index(index))
         return self.cache[index]
 
+    def __getitems__(self, indexes: List[Union[ChunkedIndex, int]]) -> List[Any]:
+        return self.cache.__getitems__(indexes)
+
     def __next__(self) -> Any:
-        # Prevent to create more batch on a given process
-        if self.index >= len(self):
+        if self.batch_size is None:
+            index = self._next_chunked_index()
+            if index is None:
+                self.current_epoch += 1
+                raise StopIteration
+            # Call the `__getitem__` method.
+            return self.__getitem__(index)
+
+        indexes: List[ChunkedIndex] = []
+        while len(indexes) < self.batch_size:
+            index = self._next_chunked_index()
+            if index is None:
+                break
+            indexes.append(index)
+
+        if len(indexes) == 0 or (self.drop_last and len(indexes) < self.batch_size):
             self.current_epoch += 1
             raise StopIteration
 
+        return default_collate(self.__getitems__(indexes))
+
+    def _load_next_chunks(self) -> None:
+        """Shuffle the items of the next ``num_interleaved_chunks`` chunks of the current worker together."""
+        self.first_chunk_index = self.chunk_index
+        self.chunk_index = min(self.chunk_index + self.num_interleaved_chunks, len(self.worker_intervals))
+        chunk_indexes = self.worker_chunks[self.first_chunk_index : self.chunk_index]
+        intervals = self.worker_intervals[self.first_chunk_index : self.chunk_index]
+
+        indexes = np.concatenate([np.arange(begin, end) for begin, end in intervals])
+        chunk_indexes_per_item = np.repeat(chunk_indexes, [end - begin for begin, end in intervals])
+        order = self.shuffle(np.arange(len(indexes)))
+        self.current_indexes = indexes[order].tolist()
+        self.current_chunk_indexes = chunk_indexes_per_item[order].tolist()
+        self.current_position = 0
+
+    def _next_chunked_index(self) -> Optional[ChunkedIndex]:
+        """Returns the next index to read by the current worker or None when the epoch is over."""
+        # Prevent to create more batch on a given process
+        if self.index >= self.shuffle.get_len(self.distributed_env, self.current_epoch):
+            return None
+
         # Lazily re-populate the interval to reduce memory usage.
-        if len(self.current_indexes) == 0:
+        if self.current_position == len(self.current_indexes):
             if self.chunk_index == len(self.worker_intervals):
-                self.current_epoch += 1
-                raise StopIteration
+                return None
+            self._load_next_chunks()
 
-            interval = self.worker_intervals[self.chunk_index]
-            current_indexes = np.arange(interval[0], interval[1])
-            self.current_indexes = self.shuffle(current_indexes)
-            self.chunk_index += 1
+        # Get the next index
+        index = self.current_indexes[self.current_position]
 
-        # Get the first index
-        index = self.current_indexes.pop(0)
-
-        # Call the `__getitem__` method.
-        data = self.__getitem__(
-            ChunkedIndex(
-                index=index,
-                chunk_index=self.worker_chunks[self.chunk_index - 1],
-                chunk_indexes=None if self.has_triggered_download else self.worker_chunks,
-            )
+        chunked_index = ChunkedIndex(
+            index=index,
+            chunk_index=self.current_chunk_indexes[self.current_position],
+            chunk_indexes=None if self.has_triggered_download else self.worker_chunks[self.first_chunk_index :],
         )
 
         self.has_triggered_download = True
+        self.current_position += 1
         self.index += 1
 
-        return data
+        return chunked_index
@@ -13,7 +13,7 @@
 import os
 import shutil
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 from urllib import parse
 
 
@@ -29,12 +29,34 @@ class Downloader(ABC):
         remote_chunkpath = os.path.join(self._remote_dir, chunk_filename)
         self.download_file(remote_chunkpath, local_chunkpath)
 
+    def read_chunk_ranges(self, chunk_index: int, ranges: List[Tuple[int, int]]) -> List[bytes]:
+        """Read the ``[begin, end)`` byte ranges of a remote chunk without downloading it.
+
+        The ranges close to each other are coalesced and fetched with a single request.
+
+        """
+        remote_chunkpath = os.path.join(self._remote_dir, self._chunks[chunk_index]["filename"])
+        merged_ranges, owners = _coalesce_ranges(ranges, _MAX_COALESCED_GAP)
+        merged_data = [self.read_range(remote_chunkpath, begin, end) for begin, end in merged_ranges]
+        return [
+            merged_data[owner][begin - merged_ranges[owner][0] : end - merged_ranges[owner][0]]
+            for (begin, end), owner in zip(ranges, owners)
+        ]
+
     @abstractmethod
     def download_file(self, remote_chunkpath: str, local_chunkpath: str) -> None:
         pass
 
+    def read_range(self, remote_filepath: str, begin: int, end: int) -> bytes:
+        """Read the ``[begin, end)`` bytes of a remote file."""
+        raise NotImplementedError(f"The {self.__class__.__name__} doesn't support reading byte ranges.")
+
 
 class S3Downloader(Downloader):
+    def __init__(self, remote_dir: str, cache_dir: str, chunks: List[Dict[str, Any]]):
+        super().__init__(remote_dir, cache_dir, chunks)
+        self._client: Optional[Any] = None
+
     @classmethod
     def download_file(cls, remote_filepath: str, local_filepath: str) -> None:
         import boto3
@@ -63,6 +85,29 @@ class S3Downloader(Downloader):
             Config=TransferConfig(use_threads=False),
         )
 
+    def read_range(self, remote_filepath: str, begin: int, end: int) -> bytes:
+        import boto3
+        from botocore.config import Config
+
+        obj = parse.urlparse(remote_filepath)
+
+        if obj.scheme != "s3":
+            raise ValueError(f"Expected obj.scheme to be `s3`, instead, got {obj.scheme} for remote={remote_filepath}")
+
+        # The client is reused across the requests, unlike the session it is thread safe.
+        if self._client is None:
+            self._client = boto3.session.Session().client("s3", config=Config(read_timeout=None))
+
+        response = self._client.get_object(
+            Bucket=obj.netloc, Key=obj.path.lstrip("/"), Range=f"bytes={begin}-{end - 1}"
+        )
+        return response["Body"].read()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_client"] = None
+        return state
+
 
 class LocalDownloader(Downloader):
     @classmethod
@@ -71,9 +116,35 @@ class LocalDownloader(Downloader):
             raise FileNotFoundError("The provided remote_path doesn't exist: {remote_path}")
         shutil.copy(remote_filepath, local_filepath)
 
+    def read_range(self, remote_filepath: str, begin: int, end: int) -> bytes:
+        with open(remote_filepath, "rb") as f:
+            f.seek(begin)
+            return f.read(end - begin)
+
 
 _DOWNLOADERS = {"s3://": S3Downloader, "": LocalDownloader}
 
+# Reading a few unneeded bytes is cheaper than an additional request.
+_MAX_COALESCED_GAP = 1 << 16
+
+
+def _coalesce_ranges(ranges: List[Tuple[int, int]], max_gap: int) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """Merge the ``[begin, end)`` ranges separated by at most ``max_gap`` bytes.
+
+    Returns the merged ranges and, for each of the provided ranges, the index of the merged range containing it.
+
+    """
+    merged_ranges: List[List[int]] = []
+    owners = [0] * len(ranges)
+    for position in sorted(range(len(ranges)), key=lambda position: ranges[position]):
+        begin, end = ranges[position]
+        if merged_ranges and begin <= merged_ranges[-1][1] + max_gap:
+            merged_ranges[-1][1] = max(merged_ranges[-1][1], end)
+        else:
+            merged_ranges.append([begin, end])
+        owners[position] = len(merged_ranges) - 1
+    return [(begin, end) for begin, end in merged_ranges], owners
+
 
 def get_downloader_cls(remote_dir: str) -> Type[Downloader]:
     for k, cls in _DOWNLOADERS.items():
@@ -0,0 +1,209 @@
+# Copyright The Lightning AI team.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_MAGIC = b"LTCHUNKS"
+_VERSION = 1
+_ALIGNMENT = 8
+
+# The name and dtype of the columns stored in the binary index.
+_COLUMNS = {
+    "chunk_bytes": np.int64,
+    "chunk_size": np.int64,
+    "dim": np.int64,
+    "codec": np.int16,
+    "filename_offsets": np.int64,
+    "filenames": np.uint8,
+    "frame_offsets": np.int64,
+    "frame_sizes": np.int64,
+}
+
+
+class ChunksIndex(Sequence):
+    """The ChunksIndex stores the metadata of the chunks as columns of NumPy arrays.
+
+    It behaves as the list of chunk dictionaries found in the JSON index, while the binary format can be memory
+    mapped, so the DataLoader workers share the index through the page cache instead of building their own copy.
+
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], codecs: List[str], filepath: Optional[str] = None) -> None:
+        self._columns = columns
+        self._codecs = codecs
+        self._filepath = filepath
+
+    @property
+    def chunk_sizes(self) -> np.ndarray:
+        return self._columns["chunk_size"]
+
+    @property
+    def chunk_bytes(self) -> np.ndarray:
+        return self._columns["chunk_bytes"]
+
+    @property
+    def dims(self) -> np.ndarray:
+        """Returns the dimension of the chunks, ``-1`` when it isn't defined."""
+        return self._columns["dim"]
+
+    def get_filename(self, chunk_index: int) -> str:
+        begin, end = self._columns["filename_offsets"][chunk_index : chunk_index + 2]
+        return self._columns["filenames"][begin:end].tobytes().decode("utf-8")
+
+    def get_compression(self, chunk_index: int) -> Optional[str]:
+        codec = self._columns["codec"][chunk_index]
+        return self._codecs[codec] if codec >= 0 else None
+
+    def get_frame_sizes(self, chunk_index: int) -> Optional[List[int]]:
+        if self._columns["codec"][chunk_index] < 0:
+            return None
+        begin, end = self._columns["frame_offsets"][chunk_index : chunk_index + 2]
+        return self._columns["frame_sizes"][begin:end].tolist()
+
+    def __len__(self) -> int:
+        return len(self._columns["chunk_size"])
+
+    def __getitem__(self, chunk_index: int) -> Dict[str, Any]:  # type: ignore[override]
+        """Returns the chunk metadata in the same format as the JSON index."""
+        if not -len(self) <= chunk_index < len(self):
+            raise IndexError(f"The chunk index {chunk_index} is out of range for {len(self)} chunks.")
+        chunk_index %= len(self)
+
+        dim = int(self._columns["dim"][chunk_index])
+        chunk = {
+            "chunk_bytes": int(self._columns["chunk_bytes"][chunk_index]),
+            "chunk_size": int(self._columns["chunk_size"][chunk_index]),
+            "filename": self.get_filename(chunk_index),
+            "dim": None if dim < 0 else dim,
+        }
+
+        compression = self.get_compression(chunk_index)
+        if compression:
+            chunk["compression"] = compression
+            chunk["frame_sizes"] = self.get_frame_sizes(chunk_index)
+        return chunk
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict[str, Any]]) -> "ChunksIndex":
+        """Build the columns from the list of chunk dictionaries found in the JSON index."""
+        codecs = sorted({chunk["compression"] for chunk in chunks if chunk.get("compression")})
+        filenames = [chunk["filename"].encode("utf-8") for chunk in chunks]
+        frame_sizes = [chunk.get("frame_sizes") or [] for chunk in chunks]
+        columns = {
+            "chunk_bytes": [chunk["chunk_bytes"] for chunk in chunks],
+            "chunk_size": [chunk["chunk_size"] for chunk in chunks],
+            "dim": [-1 if chunk["dim"] is None else chunk["dim"] for chunk in chunks],
+            "codec": [codecs.index(chunk["compression"]) if chunk.get("compression") else -1 for chunk in chunks],
+            "filename_offsets": np.cumsum([0] + [len(filename) for filename in filenames]),
+            "filenames": np.frombuffer(b"".join(filenames), np.uint8),
+            "frame_offsets": np.cumsum([0] + [len(sizes) for sizes in frame_sizes]),
+            "frame_sizes": [size for sizes in frame_sizes for size in sizes],
+        }
+        return cls({name: np.asarray(columns[name], dtype) for name, dtype in _COLUMNS.items()}, codecs)
+
+    @classmethod
+    def concatenate(cls, indexes: List["ChunksIndex"]) -> "ChunksIndex":
+        """Concatenate the chunks of several indexes, e.g. the ones written by each worker."""
+        if not indexes:
+            return cls.from_chunks([])
+
+        codecs = sorted({codec for index in indexes for codec in index._codecs})
+        columns: Dict[str, List[np.ndarray]] = {name: [] for name in _COLUMNS}
+        filename_offset = frame_offset = 0
+        for i, index in enumerate(indexes):
+            # Skip the leading zero of the offsets, except for the first index.
+            start = 0 if i == 0 else 1
+            for name in ("chunk_bytes", "chunk_size", "dim", "filenames", "frame_sizes"):
+                columns[name].append(index._columns[name])
+            columns["filename_offsets"].append(index._columns["filename_offsets"][start:] + filename_offset)
+            columns["frame_offsets"].append(index._columns["frame_offsets"][start:] + frame_offset)
+            filename_offset += len(index._columns["filenames"])
+            frame_offset += len(index._columns["frame_sizes"])
+
+            # Remap the codecs of the index to the merged codecs.
+            mapping = np.array([codecs.index(codec) for codec in index._codecs] + [-1], dtype=np.int16)
+            columns["codec"].append(mapping[index._columns["codec"]])
+
+        return cls({name: np.concatenate(columns[name]).astype(dtype) for name, dtype in _COLUMNS.items()}, codecs)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # The memory mapped indexes are mapped again instead of being copied.
+        if self._filepath is not None:
+            state["_columns"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._columns is None:
+            self._columns = load_index(self._filepath)[1]._columns
+
+
+def save_index(filepath: str, config: Dict[str, Any], chunks: ChunksIndex) -> None:
+    """Write the config and the chunks columns into a single binary file.
+
+    The file starts with a magic string, the format version and the length of a JSON header describing the config and
+    where each column is stored. The columns follow, aligned so they can be memory mapped.
+
+    """
+    columns = {}
+    offset = 0
+    for name, dtype in _COLUMNS.items():
+        column = np.ascontiguousarray(chunks._columns[name], dtype=dtype)
+        columns[name] = {"dtype": np.dtype(dtype).str, "offset": offset, "length": len(column)}
+        offset += -(-column.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({"config": config, "codecs": chunks._codecs, "columns": columns}, sort_keys=True).encode()
+    header += b" " * (-(len(_MAGIC) + 8 + len(header)) % _ALIGNMENT)
+
+    # Write to a temporary file first, so the readers never load a partial index.
+    tmp_filepath = filepath + ".tmp"
+    with open(tmp_filepath, "wb") as f:
+        f.write(_MAGIC)
+        f.write(np.array([_VERSION, len(header)], dtype=np.uint32).tobytes())
+        f.write(header)
+        for name, dtype in _COLUMNS.items():
+            column = np.ascontiguousarray(chunks._columns[name], dtype=dtype)
+            f.write(column.tobytes())
+            f.write(b"\0" * (-column.nbytes % _ALIGNMENT))
+    os.replace(tmp_filepath, filepath)
+
+
+def load_index(filepath: str) -> Tuple[Dict[str, Any], ChunksIndex]:
+    """Load the config and the chunks from either a binary or a JSON index."""
+    if filepath.endswith(".json"):
+        with open(filepath) as f:
+            data = json.load(f)
+        return data["config"], ChunksIndex.from_chunks(data["chunks"])
+
+    mmap = np.memmap(filepath, dtype=np.uint8, mode="r")
+    if mmap[: len(_MAGIC)].tobytes() != _MAGIC:
+        raise ValueError(f"The file {filepath} isn't a binary chunks index.")
+
+    version, header_length = np.frombuffer(mmap, np.uint32, count=2, offset=len(_MAGIC))
+    if version != _VERSION:
+        raise ValueError(f"The binary chunks index version {version} isn't supported. Expected {_VERSION}.")
+
+    begin = len(_MAGIC) + 8
+    header = json.loads(mmap[begin : begin + header_length].tobytes())
+    begin += int(header_length)
+
+    columns = {
+        name: np.frombuffer(mmap, np.dtype(column["dtype"]), count=column["length"], offset=begin + column["offset"])
+        for name, column in header["columns"].items()
+    }
+    return header["config"], ChunksIndex(columns, header["codecs"], filepath)
@@ -11,10 +11,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 from abc import ABC, abstractmethod
-from time import sleep
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -23,6 +22,7 @@ from lightning.data.streaming.constants import (
     _TORCH_DTYPES_MAPPING,
     _TORCH_GREATER_EQUAL_2_1_0,
 )
+from lightning.data.streaming.index import ChunksIndex
 from lightning.data.streaming.serializers import _SERIALIZERS
 
 if _TORCH_GREATER_EQUAL_2_1_0:
@@ -32,7 +32,7 @@ if _TORCH_GREATER_EQUAL_2_1_0:
 class BaseItemLoader(ABC):
     """The base item loader is responsible to decide how the items within a chunk are loaded."""
 
-    def setup(self, config: Dict, chunks: List) -> None:
+    def setup(self, config: Dict, chunks: ChunksIndex) -> None:
         self._config = config
         self._chunks = chunks
         self._serializers = _SERIALIZERS
@@ -47,41 +47,114 @@ class BaseItemLoader(ABC):
         """Returns an item loaded from a chunk."""
         pass
 
+    def load_items_from_chunk(self, indexes: List[int], chunk_index: int, chunk_filepath: str, begin: int) -> List[Any]:
+        """Returns the items loaded from a chunk for the given indexes."""
+        return [self.load_item_from_chunk(index, chunk_index, chunk_filepath, begin) for index in indexes]
+
+    def load_items_from_ranges(
+        self,
+        indexes: List[int],
+        chunk_index: int,
+        begin: int,
+        read_ranges: Callable[[List[Tuple[int, int]]], List[bytes]],
+    ) -> List[Any]:
+        """Returns the items loaded by reading only their bytes from the chunk with ``read_ranges``."""
+        raise NotImplementedError(f"The {self.__class__.__name__} doesn't support reading byte ranges.")
+
+    def delete(self, chunk_index: int, chunk_filepath: str) -> None:
+        """Release any state held for a chunk whose local file has been evicted."""
+
 
 class PyTreeLoader(BaseItemLoader):
-    """The Pytree Loader is the default loader of the Cache object."""
+    """The Pytree Loader is the default loader of the Cache object.
+
+    The chunks are memory mapped once and kept open, so reading an item only slices the mapped buffer. At most
+    ``max_open_chunks`` chunks are kept open, the least recently used ones are closed first.
 
-    def __init__(self) -> None:
-        self._chunk_filepaths: Dict[str, bool] = {}
+    """
+
+    def __init__(self, max_open_chunks: int = 32) -> None:
+        self._max_open_chunks = max_open_chunks
+        self._mmaps: Dict[int, np.memmap] = {}
+        self._buffers: "OrderedDict[int, memoryview]" = OrderedDict()
+        # The offsets tables of the chunks read with byte ranges.
+        self._offsets: Dict[int, np.ndarray] = {}
 
     def generate_intervals(self) -> List[Tuple[int, int]]:
-        intervals = []
-        begin = 0
-        end = 0
-        for chunk in self._chunks:
-            end += chunk["chunk_size"]
-            intervals.append((begin, end))
-            begin += chunk["chunk_size"]
-        return intervals
+        ends = np.cumsum(self._chunks.chunk_sizes).tolist()
+        return list(zip([0] + ends[:-1], ends))
 
     def load_item_from_chunk(self, index: int, chunk_index: int, chunk_filepath: str, begin: int) -> bytes:
         offset = (1 + (index - begin) if index >= begin else index + 1) * 4
 
-        if chunk_filepath not in self._chunk_filepaths:
-            while not os.path.exists(chunk_filepath):
-                sleep(0.001)
-            self._chunk_filepaths[chunk_filepath] = True
-
-        with open(chunk_filepath, "rb", 0) as fp:
-            fp.seek(offset)
-            pair = fp.read(8)
-            begin, end = np.frombuffer(pair, np.uint32)
-            fp.seek(begin)
-            data = fp.read(end - begin)
-        return self.deserialize(data)
+        buffer = self._buffers.get(chunk_index)
+        if buffer is None:
+            buffer = self._open_chunk(chunk_index, chunk_filepath)
+        else:
+            self._buffers.move_to_end(chunk_index)
+
+        begin, end = np.frombuffer(buffer, np.uint32, count=2, offset=offset)
+        return self.deserialize(buffer[begin:end])
+
+    def load_items_from_chunk(self, indexes: List[int], chunk_index: int, chunk_filepath: str, begin: int) -> List[Any]:
+        buffer = self._buffers.get(chunk_index)
+        if buffer is None:
+            buffer = self._open_chunk(chunk_index, chunk_filepath)
+        else:
+            self._buffers.move_to_end(chunk_index)
+
+        # Look up the offsets of all the items at once.
+        num_items = int(self._chunks.chunk_sizes[chunk_index])
+        offsets = np.frombuffer(buffer, np.uint32, count=num_items + 1, offset=4)
+        positions = np.asarray(indexes, dtype=np.int64) - begin
+        begins = offsets[positions].tolist()
+        ends = offsets[positions + 1].tolist()
+        return [self.deserialize(buffer[item_begin:item_end]) for item_begin, item_end in zip(begins, ends)]
+
+    def load_items_from_ranges(
+        self,
+        indexes: List[int],
+        chunk_index: int,
+        begin: int,
+        read_ranges: Callable[[List[Tuple[int, int]]], List[bytes]],
+    ) -> List[Any]:
+        # The offsets table is read once per chunk, then only the bytes of the requested items are read.
+        offsets = self._offsets.get(chunk_index)
+        if offsets is None:
+            num_items = int(self._chunks.chunk_sizes[chunk_index])
+            (header,) = read_ranges([(4, 4 * (num_items + 2))])
+            offsets = self._offsets[chunk_index] = np.frombuffer(header, np.uint32)
+
+        positions = np.asarray(indexes, dtype=np.int64) - begin
+        ranges = list(zip(offsets[positions].tolist(), offsets[positions + 1].tolist()))
+        return [self.deserialize(data) for data in read_ranges(ranges)]
+
+    def _open_chunk(self, chunk_index: int, chunk_filepath: str) -> memoryview:
+        while len(self._buffers) >= self._max_open_chunks:
+            oldest_chunk_index, _ = self._buffers.popitem(last=False)
+            self._mmaps.pop(oldest_chunk_index, None)
+
+        mmap = np.memmap(chunk_filepath, mode="r", order="C")
+        self._mmaps[chunk_index] = mmap
+        self._buffers[chunk_index] = buffer = memoryview(mmap)  # type: ignore
+        return buffer
+
+    def delete(self, chunk_index: int, chunk_filepath: str) -> None:
+        self._buffers.pop(chunk_index, None)
+        self._mmaps.pop(chunk_index, None)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_mmaps"] = {}
+        state["_buffers"] = OrderedDict()
+        return state
 
     def deserialize(self, raw_item_data: bytes) -> "PyTree":
-        """Deserialize the raw bytes into their python equivalent."""
+        """Deserialize the raw bytes into their python equivalent.
+
+        The raw bytes are usually a memoryview over the memory mapped chunk, so the fields are sliced without copies.
+
+        """
         idx = len(self._config["data_format"]) * 4
         sizes = np.frombuffer(raw_item_data[:idx], np.uint32)
         data = []
@@ -109,32 +182,20 @@ class TokensLoader(BaseItemLoader):
         self._buffers: Dict[int, bytes] = {}
         self._dtype: Optional[torch.dtype] = None
 
-    def setup(self, config: Dict, chunks: List) -> None:
+    def setup(self, config: Dict, chunks: ChunksIndex) -> None:
         super().setup(config, chunks)
         self._dtype = _TORCH_DTYPES_MAPPING[int(config["data_format"][0].split(":")[1])]
-        if all(chunk["dim"] is None for chunk in self._chunks):
+        if (self._chunks.dims < 0).all():
             raise ValueError("The provided chunks isn't properly setup.")
 
     def generate_intervals(self) -> List[Tuple[int, int]]:
-        begin = 0
-        end = 0
-        for chunk in self._chunks:
-            dim = chunk["dim"]
-            num_blocks = dim // self._block_size
-            end += num_blocks
-            self._intervals.append((begin, end))
-            begin += num_blocks
-
+        ends = np.cumsum(self._chunks.dims // self._block_size).tolist()
+        self._intervals = list(zip([0] + ends[:-1], ends))
         return self._intervals
 
     def load_item_from_chunk(self, index: int, chunk_index: int, chunk_filepath: str, begin: int) -> torch.Tensor:
-        while not os.path.exists(chunk_filepath):
-            sleep(0.0001)
-
         if chunk_index not in self._mmaps:
-            # TODO: Add deletion and memmap close
-            chunk = self._chunks[chunk_index]
-            offset = (1 + chunk["chunk_size"] + 1) * 4
+            offset = (1 + int(self._chunks.chunk_sizes[chunk_index]) + 1) * 4
             mmap = np.memmap(chunk_filepath, mode="r", order="C", offset=offset)
             self._mmaps[chunk_index] = mmap
             self._buffers[chunk_index] = memoryview(mmap)  # type: ignore
@@ -144,3 +205,13 @@ class TokensLoader(BaseItemLoader):
         buffer: bytes = self._buffers[chunk_index]
         offset = self._dtype.itemsize * ((index - begin) if index >= begin else index + 1)
         return torch.frombuffer(buffer, dtype=self._dtype, count=self._block_size, offset=offset)
+
+    def delete(self, chunk_index: int, chunk_filepath: str) -> None:
+        self._buffers.pop(chunk_index, None)
+        self._mmaps.pop(chunk_index, None)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_mmaps"] = {}
+        state["_buffers"] = {}
+        return state
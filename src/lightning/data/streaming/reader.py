@@ -13,9 +13,10 @@
 
 import os
 import warnings
-from threading import Lock, Thread
-from time import sleep
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+from functools import partial
+from threading import Condition, Thread
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
 from lightning.data.datasets.env import _DistributedEnv, _WorkerEnv
 from lightning.data.streaming.config import ChunksConfig
@@ -31,34 +32,202 @@ if _TORCH_GREATER_EQUAL_2_1_0:
 
 
 class PrepareChunksThread(Thread):
-    """This thread is responsible to download the chunks associated to a given worker."""
+    """This thread is responsible to download the chunks associated to a given worker.
 
-    def __init__(self, config: ChunksConfig) -> None:
+    The chunks are downloaded in the order they were added, at most ``max_pre_download`` chunks ahead of the chunk
+    being read and with up to ``num_downloaders`` concurrent downloads. The reader blocks in :meth:`wait` until its
+    chunk is available.
+
+    When a ``max_cache_size`` is provided, the chunks released by the reader are evicted from the local cache in least
+    recently used order before downloading a new chunk. Chunks which are still scheduled to be read are never evicted.
+
+    """
+
+    def __init__(
+        self,
+        config: ChunksConfig,
+        max_cache_size: Optional[int] = None,
+        max_pre_download: int = 2,
+        num_downloaders: int = 1,
+    ) -> None:
         super().__init__(daemon=True)
+        if max_pre_download < 1:
+            raise ValueError(f"The `max_pre_download` should be greater or equal to 1. Found {max_pre_download}.")
+        if num_downloaders < 1:
+            raise ValueError(f"The `num_downloaders` should be greater or equal to 1. Found {num_downloaders}.")
+
         self._config = config
-        self._chunks_index_to_be_processed: List[int] = []
-        self._chunks_index_to_ready: List[int] = []
-        self._lock = Lock()
+        self._max_cache_size = max_cache_size
+        self._max_pre_download = max_pre_download
+        self._num_downloaders = num_downloaders
+        self._chunks_index_to_be_processed: Deque[int] = deque()
+        self._chunks_index_queued: Set[int] = set()
+        # The chunks downloaded or being downloaded which the reader hasn't reached yet.
+        self._chunks_index_ahead: Set[int] = set()
+        # The chunks the reader is blocked on. They bypass the pre-download window.
+        self._chunks_index_waited: Set[int] = set()
+        self._chunks_index_ready: Set[int] = set()
+        self._chunks_errors: Dict[int, BaseException] = {}
+        # The chunks scheduled or being read by the worker. They can't be evicted.
+        self._chunks_index_in_use: Set[int] = set()
+        # The downloaded chunks released by the reader, ordered from the least to the most recently used.
+        self._chunks_index_to_evict: "OrderedDict[int, int]" = OrderedDict()
+        self._chunks_bytes: Dict[int, int] = {}
+        self._chunks_bytes_downloading: Dict[int, int] = {}
+        self._condition = Condition()
+
+        self._hits = 0
+        self._misses = 0
+        self._evicted_bytes = 0
 
     def add(self, chunk_indices: List[int]) -> None:
         """Receive the list of the chunk indices to download for the current epoch."""
-        with self._lock:
-            for chunk_indice in chunk_indices:
-                if chunk_indice not in self._chunks_index_to_be_processed:
-                    self._chunks_index_to_be_processed.append(chunk_indice)
+        with self._condition:
+            for chunk_index in chunk_indices:
+                self._schedule(chunk_index)
+            self._condition.notify_all()
 
-    def run(self) -> None:
-        while True:
-            with self._lock:
-                if len(self._chunks_index_to_be_processed) == 0:
-                    sleep(0.007)
-                    continue
+    def wait(self, chunk_index: int) -> None:
+        """Block until the given chunk is available locally.
 
-                chunk_index = self._chunks_index_to_be_processed.pop(0)
+        The chunk is scheduled first if it wasn't already and moves ahead of the other chunks waiting to be downloaded.
 
-            # TODO: Implement eviction
-            self._config.download_chunk_from_index(chunk_index)
-            self._chunks_index_to_ready.append(chunk_index)
+        """
+        with self._condition:
+            if chunk_index in self._chunks_index_queued:
+                if self._chunks_index_to_be_processed[0] != chunk_index:
+                    self._chunks_index_to_be_processed.remove(chunk_index)
+                    self._chunks_index_to_be_processed.appendleft(chunk_index)
+            elif chunk_index not in self._chunks_index_in_use:
+                self._chunks_errors.pop(chunk_index, None)
+                self._schedule(chunk_index, first=True)
+
+            self._chunks_index_waited.add(chunk_index)
+            self._condition.notify_all()
+
+            while chunk_index not in self._chunks_index_ready and chunk_index not in self._chunks_errors:
+                self._condition.wait()
+
+            self._chunks_index_waited.discard(chunk_index)
+            self._chunks_index_ahead.discard(chunk_index)
+            self._condition.notify_all()
+
+            if chunk_index in self._chunks_errors:
+                raise RuntimeError(f"Failed to download the chunk {chunk_index}.") from self._chunks_errors.pop(
+                    chunk_index
+                )
+
+    def release(self, chunk_index: int) -> None:
+        """Inform the thread the reader is done with the given chunk, so it can be evicted."""
+        with self._condition:
+            if chunk_index not in self._chunks_index_in_use:
+                return
+            self._chunks_index_in_use.discard(chunk_index)
+            self._chunks_index_ahead.discard(chunk_index)
+            if chunk_index in self._chunks_bytes:
+                self._chunks_index_to_evict[chunk_index] = self._chunks_bytes[chunk_index]
+            self._condition.notify_all()
+
+    @property
+    def cache_size(self) -> int:
+        """Returns the number of bytes of the chunks downloaded by this thread and still on disk."""
+        return sum(self._chunks_bytes.values())
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Returns the hits, misses and evicted bytes counters of the local chunk cache."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evicted_bytes": self._evicted_bytes,
+            "cache_size": self.cache_size,
+        }
+
+    def _schedule(self, chunk_index: int, first: bool = False) -> None:
+        if chunk_index in self._chunks_index_in_use:
+            return
+        self._chunks_index_in_use.add(chunk_index)
+        self._chunks_index_to_evict.pop(chunk_index, None)
+
+        # The chunk is still available locally, nothing to download.
+        if chunk_index in self._chunks_index_ready:
+            self._hits += 1
+            return
+
+        self._chunks_index_queued.add(chunk_index)
+        if first:
+            self._chunks_index_to_be_processed.appendleft(chunk_index)
+        else:
+            self._chunks_index_to_be_processed.append(chunk_index)
+
+    def _can_download(self) -> bool:
+        if not self._chunks_index_to_be_processed:
+            return False
+        if self._chunks_index_to_be_processed[0] in self._chunks_index_waited:
+            return True
+        return len(self._chunks_index_ahead) < self._max_pre_download
+
+    def _maybe_evict(self, num_bytes: int) -> None:
+        """Evict the least recently used released chunks until ``num_bytes`` fits within the cache budget."""
+        if self._max_cache_size is None:
+            return
+
+        with self._condition:
+            downloading_bytes = sum(self._chunks_bytes_downloading.values())
+            while (
+                self._chunks_index_to_evict
+                and self.cache_size + downloading_bytes + num_bytes > self._max_cache_size
+            ):
+                chunk_index, _ = self._chunks_index_to_evict.popitem(last=False)
+                self._chunks_bytes.pop(chunk_index, None)
+                self._chunks_index_ready.discard(chunk_index)
+                self._evicted_bytes += self._config.delete_chunk_from_index(chunk_index)
+
+    def _download(self, chunk_index: int) -> None:
+        # Make room for the chunk when it isn't already available locally.
+        if self._config.get_chunk_bytes(chunk_index, local=True) == 0:
+            num_bytes = self._config.get_chunk_bytes(chunk_index)
+            self._maybe_evict(num_bytes)
+            with self._condition:
+                self._chunks_bytes_downloading[chunk_index] = num_bytes
+
+        if self._config.download_chunk_from_index(chunk_index):
+            self._misses += 1
+        else:
+            self._hits += 1
+
+    def _download_loop(self) -> None:
+        while True:
+            with self._condition:
+                while not self._can_download():
+                    self._condition.wait()
+                chunk_index = self._chunks_index_to_be_processed.popleft()
+                self._chunks_index_queued.discard(chunk_index)
+                self._chunks_index_ahead.add(chunk_index)
+
+            try:
+                self._download(chunk_index)
+            except Exception as e:
+                with self._condition:
+                    self._chunks_bytes_downloading.pop(chunk_index, None)
+                    self._chunks_index_in_use.discard(chunk_index)
+                    self._chunks_index_ahead.discard(chunk_index)
+                    self._chunks_errors[chunk_index] = e
+                    self._condition.notify_all()
+                continue
+
+            with self._condition:
+                self._chunks_bytes_downloading.pop(chunk_index, None)
+                self._chunks_bytes[chunk_index] = self._config.get_chunk_bytes(chunk_index, local=True)
+                if chunk_index not in self._chunks_index_in_use:
+                    self._chunks_index_to_evict[chunk_index] = self._chunks_bytes[chunk_index]
+                self._chunks_index_ready.add(chunk_index)
+                self._condition.notify_all()
+
+    def run(self) -> None:
+        for _ in range(self._num_downloaders - 1):
+            Thread(target=self._download_loop, daemon=True).start()
+        self._download_loop()
 
 
 class BinaryReader:
@@ -68,6 +237,10 @@ class BinaryReader:
         remote_dir: Optional[str] = None,
         compression: Optional[str] = None,
         item_loader: Optional[BaseItemLoader] = None,
+        max_cache_size: Optional[int] = None,
+        max_pre_download: int = 2,
+        num_downloaders: int = 1,
+        range_read: bool = False,
     ) -> None:
         """The BinaryReader enables to read chunked dataset in an efficient way.
 
@@ -77,6 +250,11 @@ class BinaryReader:
                 The scheme needs to be added to the path.
             compression: The algorithm to decompress the chunks.
             item_loader: The chunk sampler to create sub arrays from a chunk.
+            max_cache_size: The maximum number of bytes of downloaded chunks to keep on the local disk.
+            max_pre_download: The maximum number of chunks downloaded ahead of the chunk being read.
+            num_downloaders: The number of chunks downloaded concurrently.
+            range_read: Whether to read the items from the remote chunks with byte range requests instead of
+                downloading the chunks. This is faster for random access to a few items of large chunks.
 
         """
         super().__init__()
@@ -88,6 +266,9 @@ class BinaryReader:
         if not os.path.exists(self._cache_dir):
             raise FileNotFoundError(f"The provided cache_dir `{self._cache_dir}` doesn't exist.")
 
+        if range_read and compression:
+            raise ValueError("Reading byte ranges isn't supported for compressed chunks.")
+
         self._compression = compression
         self._intervals: Optional[List[str]] = None
 
@@ -96,8 +277,12 @@ class BinaryReader:
         self._rank: Optional[int] = None
         self._config: Optional[ChunksConfig] = None
         self._prepare_thread: Optional[PrepareChunksThread] = None
-        self._chunks_index_to_be_processed: List[int] = []
+        self._last_chunk_index: Optional[int] = None
         self._item_loader = item_loader or PyTreeLoader()
+        self._max_cache_size = max_cache_size
+        self._max_pre_download = max_pre_download
+        self._num_downloaders = num_downloaders
+        self._range_read = range_read and remote_dir is not None
 
     def _get_chunk_index_from_index(self, index: int) -> int:
         # Load the config containing the index
@@ -106,6 +291,13 @@ class BinaryReader:
 
         return self._config._get_chunk_index_from_index(index)  # type: ignore
 
+    def chunk_indices_for(self, indices: List[int]) -> List[int]:
+        """Returns the index of the chunk containing each of the provided indices."""
+        if self._config is None and self._try_load_config() is None:
+            raise Exception("The reader index isn't defined.")
+
+        return self._config.chunk_indices_for(indices).tolist()  # type: ignore
+
     def _try_load_config(self) -> Optional[ChunksConfig]:
         """Try to load the chunks config if the index files are available."""
         self._config = ChunksConfig.load(self._cache_dir, self._remote_dir, self._item_loader)
@@ -136,6 +328,59 @@ class BinaryReader:
         if not isinstance(index, ChunkedIndex):
             raise ValueError("The Reader.read(...) method expects a chunked Index.")
 
+        if self._range_read:
+            return self._read_ranges([index])[0]
+
+        self._prepare_chunk(index)
+
+        # Fetch the element
+        chunk_filepath, begin, _ = self.config[index]
+        return self._item_loader.load_item_from_chunk(index.index, index.chunk_index, chunk_filepath, begin)
+
+    def read_many(self, indexes: List[ChunkedIndex]) -> List[Any]:
+        """Read several items at once.
+
+        The indexes belonging to the same chunk are loaded together, so the chunk is prepared once and the item loader
+        can look up their offsets in a single pass. The items are returned in the order of the provided indexes.
+
+        """
+        if not all(isinstance(index, ChunkedIndex) for index in indexes):
+            raise ValueError("The Reader.read_many(...) method expects a list of chunked Index.")
+
+        # Group the positions of the indexes by chunk, in the order the chunks are first encountered.
+        positions_per_chunk: Dict[int, List[int]] = {}
+        for position, index in enumerate(indexes):
+            positions_per_chunk.setdefault(index.chunk_index, []).append(position)
+
+        items: List[Any] = [None] * len(indexes)
+        for chunk_index, positions in positions_per_chunk.items():
+            if self._range_read:
+                chunk_items = self._read_ranges([indexes[position] for position in positions])
+            else:
+                first_index = indexes[positions[0]]
+                self._prepare_chunk(first_index)
+
+                chunk_filepath, begin, _ = self.config[first_index]
+                chunk_items = self._item_loader.load_items_from_chunk(
+                    [indexes[position].index for position in positions], chunk_index, chunk_filepath, begin
+                )
+            for position, item in zip(positions, chunk_items):
+                items[position] = item
+        return items
+
+    def _read_ranges(self, indexes: List[ChunkedIndex]) -> List[Any]:
+        """Read the items of a single chunk from the remote chunk with byte range requests."""
+        if self._config is None and self._try_load_config() is None:
+            raise Exception("The reader index isn't defined.")
+
+        chunk_index = indexes[0].chunk_index
+        _, begin, _ = self.config[indexes[0]]
+        return self._item_loader.load_items_from_ranges(
+            [index.index for index in indexes], chunk_index, begin, partial(self.config.read_chunk_ranges, chunk_index)
+        )
+
+    def _prepare_chunk(self, index: ChunkedIndex) -> None:
+        """Ensure the chunk associated to the index is available locally."""
         # Load the config containing the index
         if self._config is None and self._try_load_config() is None:
             raise Exception("The reader index isn't defined.")
@@ -143,21 +388,29 @@ class BinaryReader:
         if self._config and self._config._remote_dir:
             # Create and start the prepare chunks thread
             if self._prepare_thread is None and self._config:
-                self._prepare_thread = PrepareChunksThread(self._config)
+                self._prepare_thread = PrepareChunksThread(
+                    self._config,
+                    max_cache_size=self._max_cache_size,
+                    max_pre_download=self._max_pre_download,
+                    num_downloaders=self._num_downloaders,
+                )
                 self._prepare_thread.start()
-                if index.chunk_indexes:
-                    self._chunks_index_to_be_processed.extend(index.chunk_indexes)
-                    self._prepare_thread.add(index.chunk_indexes)
 
-            # If the chunk_index isn't already in the download queue, add it.
-            if index.chunk_index not in self._chunks_index_to_be_processed:
+            if index.chunk_indexes:
+                self._prepare_thread.add(index.chunk_indexes)
+
+            # When moving to a new chunk, release the previous one and wait for the new one to be available.
+            if index.chunk_index != self._last_chunk_index:
                 assert self._prepare_thread
-                self._prepare_thread.add([index.chunk_index])
-                self._chunks_index_to_be_processed.append(index.chunk_index)
+                if self._last_chunk_index is not None:
+                    self._prepare_thread.release(self._last_chunk_index)
+                self._prepare_thread.wait(index.chunk_index)
+                self._last_chunk_index = index.chunk_index
 
-        # Fetch the element
-        chunk_filepath, begin, _ = self.config[index]
-        return self._item_loader.load_item_from_chunk(index.index, index.chunk_index, chunk_filepath, begin)
+        elif index.chunk_index != self._last_chunk_index:
+            # The compressed chunks of a local dataset are decompressed before being read.
+            self.config.download_chunk_from_index(index.chunk_index)
+            self._last_chunk_index = index.chunk_index
 
     def get_length(self) -> int:
         """Get the number of samples across all chunks."""
@@ -173,7 +426,15 @@ class BinaryReader:
 
         return self.config.intervals
 
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Returns the hits, misses and evicted bytes counters of the local chunk cache of this worker."""
+        if self._prepare_thread is None:
+            return {"hits": 0, "misses": 0, "evicted_bytes": 0, "cache_size": 0}
+        return self._prepare_thread.stats
+
     def __getstate__(self) -> Dict[str, Any]:
         state = self.__dict__.copy()
         state["_prepare_thread"] = None
+        state["_last_chunk_index"] = None
         return state
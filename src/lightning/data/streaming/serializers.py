@@ -76,7 +76,7 @@ class PILSerializer(Serializer):
         idx = 3 * 4
         width, height, mode_size = np.frombuffer(data[:idx], np.uint32)
         idx2 = idx + mode_size
-        mode = data[idx:idx2].decode("utf-8")
+        mode = bytes(data[idx:idx2]).decode("utf-8")
         size = width, height
         raw = data[idx2:]
         return Image.frombytes(mode, size, raw)  # pyright: ignore
@@ -92,7 +92,7 @@ class IntSerializer(Serializer):
         return str(item).encode("utf-8"), None
 
     def deserialize(self, data: bytes) -> int:
-        return int(data.decode("utf-8"))
+        return int(bytes(data).decode("utf-8"))
 
     def can_serialize(self, item: Any) -> bool:
         return isinstance(item, int)
@@ -136,7 +136,8 @@ class BytesSerializer(Serializer):
         return item, None
 
     def deserialize(self, item: bytes) -> bytes:
-        return item
+        # The item loaders provide a view over the chunk.
+        return bytes(item)
 
     def can_serialize(self, item: bytes) -> bool:
         return isinstance(item, bytes)
@@ -151,22 +152,22 @@ class TensorSerializer(Serializer):
 
     def serialize(self, item: torch.Tensor) -> Tuple[bytes, Optional[str]]:
         dtype_indice = self._dtype_to_indice[item.dtype]
-        data = [np.uint32(dtype_indice).tobytes()]
-        data.append(np.uint32(len(item.shape)).tobytes())
-        for dim in item.shape:
-            data.append(np.uint32(dim).tobytes())
-        data.append(item.numpy().tobytes(order="C"))
-        return b"".join(data), None
+        header = np.array([dtype_indice, len(item.shape), *item.shape], np.uint32)
+        array = np.ascontiguousarray(item.numpy())
+
+        # Copy the header and the tensor once into the serialized item.
+        data = bytearray(header.nbytes + array.nbytes)
+        view = memoryview(data)
+        view[: header.nbytes] = header.data.cast("B")
+        view[header.nbytes :] = array.reshape(-1).view(np.uint8).data
+        return data, None
 
     def deserialize(self, data: bytes) -> torch.Tensor:
-        dtype_indice = np.frombuffer(data[0:4], np.uint32).item()
+        dtype_indice, shape_size = np.frombuffer(data, np.uint32, count=2).tolist()
         dtype = _TORCH_DTYPES_MAPPING[dtype_indice]
-        shape_size = np.frombuffer(data[4:8], np.uint32).item()
-        shape = []
-        for shape_idx in range(shape_size):
-            shape.append(np.frombuffer(data[8 + 4 * shape_idx : 8 + 4 * (shape_idx + 1)], np.uint32).item())
-        tensor = torch.frombuffer(data[8 + 4 * (shape_idx + 1) : len(data)], dtype=dtype)
-        shape = torch.Size(shape)
+        shape = torch.Size(np.frombuffer(data, np.uint32, count=shape_size, offset=8).tolist())
+        # The tensor is a view over the provided data, which is the memory mapped chunk when read by the item loader.
+        tensor = torch.frombuffer(data, dtype=dtype, offset=8 + 4 * shape_size)
         if tensor.shape == shape:
             return tensor
         return torch.reshape(tensor, shape)
@@ -188,7 +189,8 @@ class NoHeaderTensorSerializer(Serializer):
 
     def serialize(self, item: torch.Tensor) -> Tuple[bytes, Optional[str]]:
         dtype_indice = self._dtype_to_indice[item.dtype]
-        return item.numpy().tobytes(order="C"), f"no_header_tensor:{dtype_indice}"
+        # The writer copies the view into the chunk, so the tensor isn't copied here.
+        return np.ascontiguousarray(item.numpy()).view(np.uint8).data, f"no_header_tensor:{dtype_indice}"
 
     def deserialize(self, data: bytes) -> torch.Tensor:
         assert self._dtype
@@ -35,20 +35,22 @@ class Shuffle(ABC):
         _, intervals_per_ranks = self.get_chunks_and_intervals_per_ranks(distributed_env, current_epoch)
 
         if self.drop_last:
-            items_per_process = [
-                sum((interval[-1] - interval[0]) for interval in intervals) for intervals in intervals_per_ranks
-            ]
+            items_per_process = [_num_items(intervals) for intervals in intervals_per_ranks]
             min_items_per_process = min(items_per_process)
             return min_items_per_process
 
-        return sum((interval[-1] - interval[0]) for interval in intervals_per_ranks[distributed_env.global_rank])
+        return _num_items(intervals_per_ranks[distributed_env.global_rank])
+
+    def reset_random_state(self, current_epoch: int) -> None:
+        """Restore the random state used to shuffle the items at the beginning of the given epoch."""
+        self.random_state = np.random.RandomState(seed=self.seed + current_epoch)  # type: ignore
 
     @abstractmethod
     def get_chunks_and_intervals_per_ranks(self, distributed_env: _DistributedEnv, current_epoch: int) -> Any:
         pass
 
     @abstractmethod
-    def __call__(self, array: np.ndarray) -> List[int]:
+    def __call__(self, array: np.ndarray) -> np.ndarray:
         pass
 
 
@@ -59,21 +61,17 @@ class NoShuffle(Shuffle):
     @lru_cache(maxsize=10)
     def get_chunks_and_intervals_per_ranks(self, distributed_env: _DistributedEnv, current_epoch: int) -> Any:
         self.random_state = np.random.RandomState(seed=self.seed + current_epoch)  # type: ignore
-        chunk_intervals = self.cache.get_chunk_intervals()
-        indexes = list(range(len(chunk_intervals)))
-        shuffled_chunk_intervals = np.asarray(chunk_intervals)[indexes]
-
-        chunks_per_ranks: List[List[int]] = [[] for _ in range(distributed_env.world_size)]
-        intervals_per_ranks: List[List[List[int]]] = [[] for _ in range(distributed_env.world_size)]
-        for index, (chunk_index, chunk_interval) in enumerate(zip(indexes, shuffled_chunk_intervals)):
-            replica_index = index % distributed_env.world_size
-            chunks_per_ranks[replica_index].append(chunk_index)
-            intervals_per_ranks[replica_index].append(chunk_interval)
+        chunk_intervals = np.asarray(self.cache.get_chunk_intervals()).reshape(-1, 2)
+        indexes = np.arange(len(chunk_intervals))
 
+        # The chunks are associated to the ranks in a round robin fashion.
+        world_size = distributed_env.world_size
+        chunks_per_ranks: List[List[int]] = [indexes[rank::world_size].tolist() for rank in range(world_size)]
+        intervals_per_ranks: List[np.ndarray] = [chunk_intervals[rank::world_size] for rank in range(world_size)]
         return chunks_per_ranks, intervals_per_ranks
 
-    def __call__(self, array: np.ndarray) -> List[int]:
-        return array.tolist()
+    def __call__(self, array: np.ndarray) -> np.ndarray:
+        return array
 
 
 class FullShuffle(Shuffle):
@@ -104,53 +102,52 @@ class FullShuffle(Shuffle):
         # 2. Shuffle them
         indexes = range(len(chunk_intervals))
         shuffled_indexes = self.random_state.permutation(indexes)
-        shuffled_chunk_intervals = np.asarray(chunk_intervals)[shuffled_indexes]
+        shuffled_chunk_intervals = np.asarray(chunk_intervals).reshape(-1, 2)[shuffled_indexes]
 
         # 3. Compute the items budget of each rank
-        num_items = sum([(interval[-1] - interval[0]) for interval in chunk_intervals])
-        num_items_per_ranks: List[int] = [
-            num_items // distributed_env.world_size + num_items % distributed_env.world_size
-            if rank == distributed_env.world_size - 1 and not self.drop_last
-            else num_items // distributed_env.world_size
-            for rank in range(distributed_env.world_size)
-        ]
-        chunks_per_ranks: List[List[int]] = [[] for _ in range(distributed_env.world_size)]
-        intervals_per_ranks: List[List[List[int]]] = [[] for _ in range(distributed_env.world_size)]
-
-        # 4. Assign the chunk & intervals to each rank
-        for chunk_index, chunk_interval in zip(shuffled_indexes, shuffled_chunk_intervals):
-            rank = 0
-
-            while True:
-                if rank == len(num_items_per_ranks):
-                    break
-
-                items_left_to_assign = num_items_per_ranks[rank]
-
-                if items_left_to_assign == 0:
-                    rank += 1
-                    continue
-
-                items_in_chunk = chunk_interval[-1] - chunk_interval[0]
-
-                if items_in_chunk == 0:
-                    break
-
-                if items_in_chunk > items_left_to_assign:
-                    chunks_per_ranks[rank].append(chunk_index)
-                    begin, end = chunk_interval
-                    intervals_per_ranks[rank].append([begin, begin + items_left_to_assign])
-                    chunk_interval = (begin + items_left_to_assign, end)
-                    num_items_per_ranks[rank] = 0
-                    rank += 1
-                else:
-                    chunks_per_ranks[rank].append(chunk_index)
-                    intervals_per_ranks[rank].append(chunk_interval)
-                    num_items_per_ranks[rank] -= items_in_chunk
-                    break
+        world_size = distributed_env.world_size
+        num_items_per_chunk = shuffled_chunk_intervals[:, 1] - shuffled_chunk_intervals[:, 0]
+        num_items = int(num_items_per_chunk.sum())
+        num_items_per_ranks = np.full(world_size, num_items // world_size)
+        if not self.drop_last:
+            num_items_per_ranks[-1] += num_items % world_size
+
+        # 4. Assign the chunk & intervals to each rank. The shuffled chunks are laid out one after the other and each
+        # rank receives the next contiguous range of items, splitting the chunks at the boundaries between ranks.
+        chunks_ends = np.cumsum(num_items_per_chunk)
+        chunks_begins = chunks_ends - num_items_per_chunk
+        ranks_ends = np.cumsum(num_items_per_ranks)
+        ranks_begins = ranks_ends - num_items_per_ranks
+
+        chunks_per_ranks: List[List[int]] = []
+        intervals_per_ranks: List[np.ndarray] = []
+        for rank_begin, rank_end in zip(ranks_begins, ranks_ends):
+            # The chunks containing the first and the last items of the rank.
+            first = np.searchsorted(chunks_ends, rank_begin, side="right")
+            last = np.searchsorted(chunks_ends, rank_end, side="left")
+            selection = np.arange(first, last + 1) if rank_end > rank_begin else np.arange(0)
+            selection = selection[num_items_per_chunk[selection] > 0]
+
+            offsets_begin = np.maximum(chunks_begins[selection], rank_begin) - chunks_begins[selection]
+            offsets_end = np.minimum(chunks_ends[selection], rank_end) - chunks_begins[selection]
+            intervals = shuffled_chunk_intervals[selection, :1] + np.stack([offsets_begin, offsets_end], axis=1)
+
+            chunks_per_ranks.append(shuffled_indexes[selection].tolist())
+            intervals_per_ranks.append(intervals)
 
         return chunks_per_ranks, intervals_per_ranks
 
-    def __call__(self, array: np.ndarray) -> List[int]:
+    def reset_random_state(self, current_epoch: int) -> None:
+        super().reset_random_state(current_epoch)
+        # Replay the shuffling of the chunks performed when associating them to the ranks.
         assert self.random_state
-        return self.random_state.permutation(array).tolist()
+        self.random_state.permutation(len(self.cache.get_chunk_intervals()))
+
+    def __call__(self, array: np.ndarray) -> np.ndarray:
+        assert self.random_state
+        return self.random_state.permutation(array)
+
+
+def _num_items(intervals: np.ndarray) -> int:
+    """Returns the number of items contained in the ``[begin, end)`` intervals."""
+    return int((intervals[:, 1] - intervals[:, 0]).sum())
@@ -11,22 +11,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from time import sleep
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
 
 from lightning.data.datasets.env import _DistributedEnv, _WorkerEnv
-from lightning.data.streaming.compression import _COMPRESSORS, Compressor
-from lightning.data.streaming.constants import _INDEX_FILENAME, _TORCH_GREATER_EQUAL_2_1_0
+from lightning.data.streaming.compression import _COMPRESSORS, Compressor, compress_frames
+from lightning.data.streaming.constants import _BINARY_INDEX_FILENAME, _INDEX_FILENAME, _TORCH_GREATER_EQUAL_2_1_0
+from lightning.data.streaming.index import ChunksIndex, load_index, save_index
 from lightning.data.streaming.serializers import _SERIALIZERS, Serializer
 
 if _TORCH_GREATER_EQUAL_2_1_0:
-    from torch.utils._pytree import PyTree, tree_flatten, treespec_dumps
+    from torch.utils._pytree import PyTree, tree_flatten, treespec_dumps, treespec_loads
+
+_DEFAULT_COMPRESSION_THREADS = 4
+
+
+def _get_index_rank(index_filename: str) -> Tuple[int, str]:
+    """Returns the rank prefixing the filename of an index, so the indexes are merged in rank order."""
+    rank = index_filename.split(".")[0].split("-")[0]
+    return (int(rank) if rank.isdigit() else -1, index_filename)
 
 
 def _get_data_optimizer_node_rank() -> Optional[int]:
@@ -55,6 +64,7 @@ class BinaryWriter:
         chunk_bytes: Optional[int] = None,
         compression: Optional[str] = None,
         follow_tensor_dimension: bool = True,
+        compression_threads: int = _DEFAULT_COMPRESSION_THREADS,
     ):
         """The BinaryWriter enables to chunk dataset into an efficient streaming format for cloud training.
 
@@ -63,6 +73,7 @@ class BinaryWriter:
             chunk_bytes: The maximum number of bytes within a chunk.
             chunk_size: The maximum number of items within a chunk.
             compression: The compression algorithm to use.
+            compression_threads: The number of threads compressing the frames of a chunk concurrently.
 
         """
         self._cache_dir = cache_dir
@@ -90,10 +101,14 @@ class BinaryWriter:
                 )
             self._compressor: Compressor = _COMPRESSORS[self._compression]
 
+        self._compression_threads = compression_threads
+        self._compression_executor: Optional[ThreadPoolExecutor] = None
+
         self._serialized_items: Dict[int, Item] = {}
         self._chunk_index = 0
         self._min_index: Optional[int] = None
         self._max_index: Optional[int] = None
+        self._reset_chunk()
         self._chunks_info: List[Dict[str, Any]] = []
         self._worker_env: Optional[_WorkerEnv] = None
         self._rank: Optional[int] = None
@@ -107,7 +122,7 @@ class BinaryWriter:
         if self._is_done:
             return True
         files = os.listdir(self._cache_dir)
-        index_files = [f for f in files if f.endswith(_INDEX_FILENAME)]
+        index_files = [f for f in files if f.endswith((_INDEX_FILENAME, _BINARY_INDEX_FILENAME))]
         worker_end = _WorkerEnv.detect()
         data_optimiser_num_workers = os.getenv("DATA_OPTIMIZER_NUM_WORKERS", None)
         if data_optimiser_num_workers is not None:
@@ -139,6 +154,17 @@ class BinaryWriter:
         }
         return out
 
+    def resume(self, chunks_info: List[Dict[str, Any]], config: Dict[str, Any]) -> None:
+        """Continue writing after the chunks written by a previous run with the given config.
+
+        The next item needs to be provided with the index following the items of these chunks.
+
+        """
+        self._chunks_info = list(chunks_info)
+        self._chunk_index = len(self._chunks_info)
+        self._data_format = config["data_format"]
+        self._data_spec = treespec_loads(config["data_spec"]) if config["data_spec"] else None
+
     def serialize(self, items: Any) -> Tuple[bytes, Optional[int]]:
         """Serialize a dictionary into its binary format."""
 
@@ -172,9 +198,7 @@ class BinaryWriter:
             return data[0], flattened[0].shape[0]
 
         # Concatenante into a single byte array
-        head = np.array(sizes, np.uint32).tobytes()
-        body = b"".join(data)
-        return head + body, None
+        return b"".join([np.array(sizes, np.uint32).tobytes(), *data]), None
 
     def _serialize(self, item: Any, sizes: List[int], data: List[bytes]) -> str:
         """Serialize a given item and append its size and bytes to the sizes and data array."""
@@ -186,37 +210,32 @@ class BinaryWriter:
                 return name or serializer_name
         raise ValueError(f"The provided item isn't serializable. Found {item}")
 
-    def _create_chunk(self, filename: str, on_done: bool = False) -> bytes:
-        """Create a binary chunk from all the binarized items."""
+    def _create_chunk(self, filename: str, on_done: bool = False) -> List[bytes]:
+        """Create a binary chunk from the items appended to the chunk buffer."""
         if on_done:
             indices = sorted(self._serialized_items.keys())
-            for i in range(len(indices) - 1):
-                assert indices[i] == indices[i + 1] - 1, indices
-            min_index = indices[0]
-            max_index = indices[-1] + 1
-            num_items = np.uint32(max_index - min_index)
-            items = [self._serialized_items.pop(index) for index in indices]
+            if self._min_index is None and indices:
+                self._min_index = indices[0]
+            for index in indices:
+                assert index == self._min_index + len(self._chunk_sizes), indices
+                self._append_to_chunk(self._serialized_items.pop(index))
         else:
             assert self._max_index is not None, (self._max_index, self._min_index)
             assert self._min_index is not None, (self._max_index, self._min_index)
-            num_items = np.uint32(self._max_index - self._min_index)
-            items = [self._serialized_items.pop(index) for index in range(self._min_index, self._max_index)]
-            min_index = self._min_index
-            max_index = self._max_index
+            assert self._max_index - self._min_index == len(self._chunk_sizes)
 
-        if len(items) == 0:
+        if len(self._chunk_sizes) == 0:
             raise RuntimeError(
                 f"The items shouldn't have an empty length. Something went wrong. Found {self._serialized_items}."
             )
 
-        sizes = list(map(len, items))
-        offsets = np.array([0] + sizes).cumsum().astype(np.uint32)
+        num_items = np.uint32(len(self._chunk_sizes))
+        offsets = np.array([0] + self._chunk_sizes).cumsum().astype(np.uint32)
         offsets += len(num_items.tobytes()) + len(offsets.tobytes())
-        sample_data = b"".join([item.data for item in items])
-        data = num_items.tobytes() + offsets.tobytes() + sample_data
-        offsets = offsets.tolist()
+        # The header and the items are written one after the other instead of being copied into a single buffer.
+        data = [num_items.tobytes(), offsets.tobytes(), self._chunk_data]
 
-        current_chunk_bytes = sum([item.bytes for item in items])
+        current_chunk_bytes = len(self._chunk_data)
 
         if self._chunk_bytes:
             assert current_chunk_bytes <= self._chunk_bytes
@@ -225,8 +244,8 @@ class BinaryWriter:
             assert num_items.item() <= self._chunk_size
 
         dim: Optional[int] = None
-        if items[0].dim:
-            dim = sum([item.dim if item.dim is not None else 0 for item in items])
+        if self._chunk_dims[0]:
+            dim = sum([item_dim if item_dim is not None else 0 for item_dim in self._chunk_dims])
 
         chunk_info = {
             "chunk_bytes": current_chunk_bytes,
@@ -237,8 +256,25 @@ class BinaryWriter:
 
         self._chunks_info.append(chunk_info)
 
+        # The next chunk starts with the item which didn't fit into this one.
+        self._min_index = None if on_done else self._max_index
+        self._max_index = None
+        self._reset_chunk()
+
         return data
 
+    def _append_to_chunk(self, item: Item) -> None:
+        self._chunk_data += item.data
+        self._chunk_sizes.append(item.bytes)
+        self._chunk_dims.append(item.dim)
+        self._chunk_num_items += item.dim if item.dim else 1
+
+    def _reset_chunk(self) -> None:
+        self._chunk_data = bytearray()
+        self._chunk_sizes: List[int] = []
+        self._chunk_dims: List[Optional[int]] = []
+        self._chunk_num_items = 0
+
     def get_chunk_filename(self) -> str:
         if self._compression:
             return f"chunk-{self.rank}-{self._chunk_index}.{self._compression}.bin"
@@ -247,7 +283,12 @@ class BinaryWriter:
     def write_chunk(self, on_done: bool = False) -> str:
         """Write a chunk to the filesystem."""
         filename = self.get_chunk_filename()
-        self.write_chunk_to_file(self._create_chunk(filename, on_done=on_done), filename)
+        frame_sizes = self.write_chunk_to_file(self._create_chunk(filename, on_done=on_done), filename)
+
+        # Record the codec of each chunk, so the readers pick the right decoder.
+        if self._compression:
+            self._chunks_info[-1]["compression"] = self._compression
+            self._chunks_info[-1]["frame_sizes"] = frame_sizes
         self._chunk_index += 1
         return os.path.join(self._cache_dir, filename)
 
@@ -262,9 +303,10 @@ class BinaryWriter:
         self.add_item(index, items)
 
     def add_item(self, index: int, items: Any) -> Optional[str]:
-        # Track the minimum index provided to the writer
-        # Serialize the items and store an Item object.
-        if index in self._serialized_items:
+        # Serialize the items and store an Item object until it can be appended to the chunk buffer.
+        if index in self._serialized_items or (
+            self._min_index is not None and self._min_index <= index < self._min_index + len(self._chunk_sizes)
+        ):
             raise ValueError(f"The provided index {index} already exists in the cache.")
 
         data, dim = self.serialize(items)
@@ -275,54 +317,95 @@ class BinaryWriter:
             dim=dim,
         )
 
+        # An item preceding the chunk being filled was provided late, so the chunk needs to start from it.
+        if self._min_index is not None and index < self._min_index:
+            self._restart_chunk()
+
+        filepath = None
         if self._should_write():
             filepath = os.path.join(self._cache_dir, self.get_chunk_filename())
             self.write_chunk()
-            self._min_index = None
-            self._max_index = None
-            return filepath
+
+        # The serializers can return a view over the provided data, which needs to be copied when kept for later.
+        item = self._serialized_items.get(index)
+        if item is not None and not isinstance(item.data, bytes):
+            item.data = bytes(item.data)
+
+        return filepath
 
     def _should_write(self) -> bool:
-        if not self._serialized_items:
-            return False
-        indexes = list(self._serialized_items.keys())
-        self._min_index = index = indexes[0] if len(indexes) == 1 else min(*indexes)
-        num_bytes = 0
-        num_items = 0
+        """Append the items following the chunk buffer and return whether the next one doesn't fit in the chunk.
+
+        The contiguous items are moved from ``_serialized_items`` to the chunk buffer as they arrive, along with the
+        running counts of bytes and items, so each item is only visited once.
+
+        """
+        if self._max_index is not None:
+            return True
+
+        if self._min_index is None:
+            if not self._serialized_items:
+                return False
+            self._min_index = min(self._serialized_items)
+
         while True:
+            index = self._min_index + len(self._chunk_sizes)
             item = self._serialized_items.get(index, None)
-            if item:
-                num_bytes += item.bytes
-                num_items += item.dim if item.dim else 1
-                index += 1
-                if (self._chunk_bytes and self._chunk_bytes < num_bytes) or (
-                    self._chunk_size and num_items > self._chunk_size
-                ):
-                    self._max_index = index - 1
-                    return True
-            else:
+            if item is None:
                 return False
 
+            num_items = self._chunk_num_items + (item.dim if item.dim else 1)
+            if (self._chunk_bytes and self._chunk_bytes < len(self._chunk_data) + item.bytes) or (
+                self._chunk_size and num_items > self._chunk_size
+            ):
+                self._max_index = index
+                return True
+
+            self._append_to_chunk(self._serialized_items.pop(index))
+
+    def _restart_chunk(self) -> None:
+        """Move the items of the chunk buffer back to the serialized items."""
+        assert self._min_index is not None
+        offset = 0
+        for i, (size, dim) in enumerate(zip(self._chunk_sizes, self._chunk_dims)):
+            index = self._min_index + i
+            data = bytes(self._chunk_data[offset : offset + size])
+            self._serialized_items[index] = Item(index=index, data=data, bytes=size, dim=dim)
+            offset += size
+
+        self._min_index = None
+        self._reset_chunk()
+
     def write_chunk_to_file(
         self,
-        raw_data: bytes,
+        raw_data: Union[bytes, List[bytes]],
         filename: str,
-    ) -> None:
-        """Write chunk bytes to a file."""
+    ) -> Optional[List[int]]:
+        """Write chunk bytes to a file.
+
+        Returns the size of the compressed frames when the chunk is compressed.
+
+        """
+        frame_sizes = None
+
         # Whether to compress the raw bytes
         if self._compression:
-            raw_data = self._compressor.compress(raw_data)
+            if self._compression_executor is None and self._compression_threads > 1:
+                self._compression_executor = ThreadPoolExecutor(max_workers=self._compression_threads)
+            if isinstance(raw_data, list):
+                raw_data = b"".join(raw_data)
+            raw_data, frame_sizes = compress_frames(self._compressor, raw_data, self._compression_executor)
 
         # Write the binary chunk file
         with open(os.path.join(self._cache_dir, filename), "wb") as out:
-            out.write(raw_data)
+            out.writelines([raw_data] if isinstance(raw_data, bytes) else raw_data)
+
+        return frame_sizes
 
     def write_chunks_index(self) -> str:
-        """Write the chunks index to a JSON file."""
-        filepath = os.path.join(self._cache_dir, f"{self.rank}.{_INDEX_FILENAME}")
-        config = self.get_config()
-        with open(filepath, "w") as out:
-            json.dump({"chunks": self._chunks_info, "config": config}, out, sort_keys=True)
+        """Write the chunks index to a binary file."""
+        filepath = os.path.join(self._cache_dir, f"{self.rank}.{_BINARY_INDEX_FILENAME}")
+        save_index(filepath, self.get_config(), ChunksIndex.from_chunks(self._chunks_info))
         return filepath
 
     def done(self) -> List[str]:
@@ -336,15 +419,24 @@ class BinaryWriter:
             filepaths.append(self.write_chunk())
 
         # If any elements is left, try writing one last chunk
-        if self._serialized_items:
+        if self._serialized_items or self._chunk_sizes:
             filepaths.append(self.write_chunk(True))
 
         # Write down the index file
         self.write_chunks_index()
 
+        if self._compression_executor is not None:
+            self._compression_executor.shutdown()
+            self._compression_executor = None
+
         self._is_done = True
         return filepaths
 
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_compression_executor"] = None
+        return state
+
     def merge(self, num_workers: int = 1, node_rank: Optional[int] = None) -> None:
         """Once all the workers have written their own index, the merge function is responsible to read and merge them
         into a single index."""
@@ -352,7 +444,7 @@ class BinaryWriter:
 
         # Only for non rank 0
         if self.rank != 0:
-            while not os.path.exists(os.path.join(self._cache_dir, _INDEX_FILENAME)):
+            while not os.path.exists(os.path.join(self._cache_dir, _BINARY_INDEX_FILENAME)):
                 sleep(0.001)
             return
 
@@ -362,10 +454,10 @@ class BinaryWriter:
             files = os.listdir(self._cache_dir)
 
             # Return if the index already exists
-            if _INDEX_FILENAME in files:
+            if _BINARY_INDEX_FILENAME in files or _INDEX_FILENAME in files:
                 return
 
-            index_files = [f for f in files if f.endswith(_INDEX_FILENAME)]
+            index_files = [f for f in files if f.endswith((_INDEX_FILENAME, _BINARY_INDEX_FILENAME))]
 
             # When using the Data Optimizer, we don't use multi processes.
             is_done = len(index_files) == self._distributed_env.world_size * num_workers
@@ -377,32 +469,25 @@ class BinaryWriter:
         """Once all the workers have written their own index, the merge function is responsible to read and merge them
         into a single index."""
         files = os.listdir(self._cache_dir)
-        index_files = [f for f in files if f.endswith(_INDEX_FILENAME)]
+        index_files = [f for f in files if f.endswith((_INDEX_FILENAME, _BINARY_INDEX_FILENAME))]
 
-        chunks_info = []
+        indexes = []
         config = None
-        for index_filename in sorted(index_files):
-            chunk_path = os.path.join(self._cache_dir, index_filename)
-            with open(chunk_path) as f:
-                data = json.load(f)
+        for index_filename in sorted(index_files, key=_get_index_rank):
+            index_path = os.path.join(self._cache_dir, index_filename)
+            index_config, chunks = load_index(index_path)
 
-                if config is None:
-                    config = data["config"]
+            if config is None:
+                config = index_config
 
-                elif config != data["config"]:
-                    breakpoint()
-                    raise Exception("The config isn't consistent between chunks. This shouldn't have happened.")
+            elif config != index_config:
+                raise Exception("The config isn't consistent between chunks. This shouldn't have happened.")
 
-                chunks_info.extend(data["chunks"])
+            indexes.append(chunks)
+            os.remove(index_path)
 
-            os.remove(chunk_path)
-
-        if node_rank is None:
-            with open(os.path.join(self._cache_dir, _INDEX_FILENAME), "w") as f:
-                json.dump({"chunks": chunks_info, "config": config}, f, sort_keys=True)
-        else:
-            with open(os.path.join(self._cache_dir, f"{node_rank}-{_INDEX_FILENAME}"), "w") as f:
-                json.dump({"chunks": chunks_info, "config": config}, f, sort_keys=True)
+        filename = _BINARY_INDEX_FILENAME if node_rank is None else f"{node_rank}-{_BINARY_INDEX_FILENAME}"
+        save_index(os.path.join(self._cache_dir, filename), config, ChunksIndex.concatenate(indexes))
 
     def _should_raise(self, data_format_1: List[str], data_format_2: List[str]) -> bool:
         if len(data_format_1) != len(data_format_2):
@@ -199,7 +199,7 @@ def test_cache_with_auto_wrapping(tmpdir):
     assert sorted(os.listdir(os.path.join(tmpdir, "cache_1"))) == [
         "chunk-0-0.bin",
         "chunk-0-1.bin",
-        "index.json",
+        "index.idx",
     ]
     # Your dataset is optimised for the cloud
 
@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 from typing import Any, List
 from unittest import mock
 
@@ -7,14 +8,17 @@ import numpy as np
 import pytest
 import torch
 from lightning import seed_everything
+from lightning.data.streaming import Cache
 from lightning.data.streaming import data_processor as data_processor_module
 from lightning.data.streaming.data_processor import (
     DataChunkRecipe,
     DataProcessor,
     DataTransformRecipe,
+    _associated_items_to_work_units,
     _associated_items_to_workers,
     _download_data_target,
     _remove_target,
+    _TransferPool,
     _upload_fn,
     _wait_for_file_to_exist,
 )
@@ -61,6 +65,38 @@ def test_upload_fn(tmpdir):
     assert os.listdir(remote_output_dir) == ["a.txt"]
 
 
+def test_transfer_pool():
+    pool = _TransferPool(num_threads=2, max_pending=3)
+    event = threading.Event()
+    completed = []
+
+    def transfer(value):
+        event.wait()
+        completed.append(value)
+
+    for value in range(3):
+        pool.submit(transfer, value)
+
+    # The pool is full, submitting blocks until a transfer completes.
+    submitter = threading.Thread(target=pool.submit, args=(transfer, 3))
+    submitter.start()
+    submitter.join(0.2)
+    assert submitter.is_alive()
+
+    event.set()
+    submitter.join()
+    pool.join()
+    assert sorted(completed) == [0, 1, 2, 3]
+
+    def failing_transfer():
+        raise ValueError("failed transfer")
+
+    pool = _TransferPool(num_threads=2)
+    pool.submit(failing_transfer)
+    with pytest.raises(ValueError, match="failed transfer"):
+        pool.join()
+
+
 @pytest.mark.skipif(condition=sys.platform == "win32", reason="Not supported on windows")
 def test_remove_target(tmpdir):
     input_dir = os.path.join(tmpdir, "input_dir")
@@ -271,6 +307,33 @@ def test_associated_items_to_workers(monkeypatch):
     assert workers_user_items == [range(78, 84), range(84, 90), range(90, 96), range(96, 105)]
 
 
+def test_associated_items_to_workers_with_item_cost():
+    # The first items are 10 times more expensive, so the first workers get fewer items.
+    user_items = list(range(40))
+    _, workers_user_items = _associated_items_to_workers(2, user_items, item_cost=lambda item: 10 if item < 10 else 1)
+    assert workers_user_items == [list(range(6)), list(range(6, 40))]
+
+    _, workers_user_items = _associated_items_to_workers(2, user_items, item_cost=lambda item: 0)
+    assert workers_user_items == [list(range(20)), list(range(20, 40))]
+
+
+def test_associated_items_to_work_units(monkeypatch):
+    work_units = _associated_items_to_work_units(2, list(range(10)), num_units_per_worker=2)
+    assert work_units == [(1, [2, 3, 4]), (3, [7, 8, 9]), (0, [0, 1]), (2, [5, 6])]
+
+    # The most expensive units are processed first.
+    work_units = _associated_items_to_work_units(
+        2, list(range(10)), item_cost=lambda item: item, num_units_per_worker=2
+    )
+    assert work_units == [(2, [7, 8]), (1, [5, 6]), (0, [0, 1, 2, 3, 4]), (3, [9])]
+
+    # The unit indexes of the nodes don't overlap.
+    monkeypatch.setenv("DATA_OPTIMIZER_NUM_NODES", "2")
+    monkeypatch.setenv("DATA_OPTIMIZER_NODE_RANK", "1")
+    work_units = _associated_items_to_work_units(2, list(range(3)), num_units_per_worker=2)
+    assert work_units == [(4, [0]), (5, [1]), (6, [2])]
+
+
 class CustomDataChunkRecipe(DataChunkRecipe):
     def prepare_structure(self, input_dir: str) -> List[Any]:
         filepaths = self.listdir(input_dir)
@@ -321,7 +384,7 @@ def test_data_processsor(fast_dev_run, delete_cached_files, tmpdir, monkeypatch)
         "chunk-1-2.bin",
         "chunk-1-3.bin",
         "chunk-1-4.bin",
-        "index.json",
+        "index.idx",
     ]
 
     fast_dev_run_disabled_chunks = [
@@ -341,12 +404,13 @@ def test_data_processsor(fast_dev_run, delete_cached_files, tmpdir, monkeypatch)
         "chunk-1-5.bin",
         "chunk-1-6.bin",
         "chunk-1-7.bin",
-        "index.json",
+        "index.idx",
     ]
 
     chunks = fast_dev_run_enabled_chunks if fast_dev_run == 10 else fast_dev_run_disabled_chunks
+    manifests = ["0.manifest.jsonl", "1.manifest.jsonl", "manifest.json"]
 
-    assert sorted(os.listdir(os.path.join(cache_dir, "dummy_dataset"))) == chunks
+    assert sorted(os.listdir(os.path.join(cache_dir, "dummy_dataset"))) == sorted(chunks + manifests)
 
     files = []
     for _, _, filenames in os.walk(os.path.join(cache_dir, "data")):
@@ -400,7 +464,7 @@ def test_data_processsor_distributed(fast_dev_run, delete_cached_files, tmpdir,
     assert sorted(os.listdir(cache_dir)) == ["data", "dummy_dataset"]
 
     fast_dev_run_disabled_chunks_0 = [
-        "0-index.json",
+        "0-index.idx",
         "chunk-0-0.bin",
         "chunk-0-1.bin",
         "chunk-0-2.bin",
@@ -411,7 +475,10 @@ def test_data_processsor_distributed(fast_dev_run, delete_cached_files, tmpdir,
         "chunk-1-3.bin",
     ]
 
-    assert sorted(os.listdir(os.path.join(cache_dir, "dummy_dataset"))) == fast_dev_run_disabled_chunks_0
+    manifests_0 = ["0-0.uploaded.txt", "0-1.uploaded.txt", "0.manifest.jsonl", "1.manifest.jsonl", "manifest.json"]
+    assert sorted(os.listdir(os.path.join(cache_dir, "dummy_dataset"))) == sorted(
+        fast_dev_run_disabled_chunks_0 + manifests_0
+    )
 
     cache_dir = os.path.join(tmpdir, "cache_2")
     monkeypatch.setenv("DATA_OPTIMIZER_CACHE_FOLDER", cache_dir)
@@ -440,14 +507,161 @@ def test_data_processsor_distributed(fast_dev_run, delete_cached_files, tmpdir,
         "chunk-3-1.bin",
         "chunk-3-2.bin",
         "chunk-3-3.bin",
-        "index.json",
+        "index.idx",
     ]
-    assert sorted(os.listdir(os.path.join(cache_dir, "dummy_dataset"))) == fast_dev_run_disabled_chunks_1
+    manifests_1 = ["1-0.uploaded.txt", "1-1.uploaded.txt", "2.manifest.jsonl", "3.manifest.jsonl", "manifest.json"]
+    assert sorted(os.listdir(os.path.join(cache_dir, "dummy_dataset"))) == sorted(
+        fast_dev_run_disabled_chunks_1 + manifests_1
+    )
 
-    expected = sorted(fast_dev_run_disabled_chunks_0 + fast_dev_run_disabled_chunks_1 + ["1-index.json"])
+    expected = sorted(fast_dev_run_disabled_chunks_0 + fast_dev_run_disabled_chunks_1 + ["1-index.idx", "manifest.json"])
     assert sorted(os.listdir(remote_output_dir)) == expected
 
 
+class FileIndexRecipe(DataChunkRecipe):
+    def prepare_structure(self, input_dir: str) -> List[Any]:
+        return [os.path.join(input_dir, f"{i}.txt") for i in range(30)]
+
+    def prepare_item(self, filepath):
+        return int(os.path.basename(filepath).split(".")[0])
+
+
+@pytest.mark.skipif(condition=sys.platform == "win32", reason="Not supported on windows")
+def test_data_processor_dynamic_scheduling(tmpdir, monkeypatch):
+    input_dir = os.path.join(tmpdir, "input_dir")
+    os.makedirs(input_dir)
+    for i in range(30):
+        with open(os.path.join(input_dir, f"{i}.txt"), "w") as f:
+            f.write("0" * (i + 1))
+
+    cache_dir = os.path.join(tmpdir, "cache")
+    monkeypatch.setenv("DATA_OPTIMIZER_CACHE_FOLDER", cache_dir)
+    data_processor = DataProcessor(
+        name="dummy_dataset",
+        input_dir=input_dir,
+        num_workers=2,
+        delete_cached_files=False,
+        fast_dev_run=False,
+        dynamic_scheduling=True,
+        item_cost=os.path.getsize,
+    )
+    data_processor.run(FileIndexRecipe(chunk_size=2))
+
+    # The chunks are named after the work units, whichever worker processed them.
+    chunks = [f for f in os.listdir(os.path.join(cache_dir, "dummy_dataset")) if f.endswith(".bin")]
+    assert {chunk.split("-")[1] for chunk in chunks} == {str(unit_index) for unit_index in range(8)}
+
+    # The dataset follows the order of the items.
+    cache = Cache(os.path.join(cache_dir, "dummy_dataset"), chunk_size=2)
+    assert [cache[i] for i in range(len(cache))] == list(range(30))
+
+    assert sum(data_processor.workers_tracker.values()) == 30
+    assert sorted(data_processor.workers_durations) == [0, 1]
+
+
+class LoggedRecipe(DataChunkRecipe):
+    def __init__(self, input_dir, num_items, log_filepath):
+        super().__init__(chunk_size=2)
+        self.input_dir = input_dir
+        self.num_items = num_items
+        self.log_filepath = log_filepath
+
+    def prepare_structure(self, _):
+        return [os.path.join(self.input_dir, f"{i}.txt") for i in range(self.num_items)]
+
+    def prepare_item(self, filepath):
+        index = int(os.path.basename(filepath).split(".")[0])
+        if index == int(os.getenv("FAIL_AT_ITEM", -1)):
+            raise ValueError("The run was interrupted.")
+        with open(self.log_filepath, "a") as f:
+            f.write(f"{index}\n")
+        # The chunks end in the middle of the data of the items
+        for i in range(3):
+            yield 3 * index + i
+
+
+def _create_text_files(input_dir, num_files):
+    os.makedirs(input_dir, exist_ok=True)
+    for i in range(num_files):
+        with open(os.path.join(input_dir, f"{i}.txt"), "w") as f:
+            f.write(str(i))
+
+
+def _read_logged_items(log_filepath):
+    with open(log_filepath) as f:
+        items = [int(line) for line in f]
+    os.remove(log_filepath)
+    return items
+
+
+@pytest.mark.skipif(condition=sys.platform == "win32", reason="Not supported on windows")
+def test_data_processor_resume(tmpdir, monkeypatch):
+    input_dir = os.path.join(tmpdir, "input_dir")
+    _create_text_files(input_dir, 30)
+    log_filepath = os.path.join(tmpdir, "items.log")
+    cache_dir = os.path.join(tmpdir, "cache")
+    monkeypatch.setenv("DATA_OPTIMIZER_CACHE_FOLDER", cache_dir)
+
+    recipe = LoggedRecipe(input_dir, 30, log_filepath)
+    kwargs = {"name": "dummy_dataset", "input_dir": input_dir, "num_workers": 1, "fast_dev_run": False}
+
+    monkeypatch.setenv("FAIL_AT_ITEM", "20")
+    with pytest.raises(RuntimeError, match="The run was interrupted"):
+        DataProcessor(**kwargs).run(recipe)
+    assert _read_logged_items(log_filepath) == list(range(20))
+
+    # The last chunk recorded ends in the middle of the data of the item 19, which is processed again.
+    monkeypatch.delenv("FAIL_AT_ITEM")
+    DataProcessor(resume=True, **kwargs).run(recipe)
+    assert _read_logged_items(log_filepath) == list(range(19, 30))
+
+    cache = Cache(os.path.join(cache_dir, "dummy_dataset"), chunk_size=2)
+    assert [cache[i] for i in range(len(cache))] == list(range(90))
+
+    # A finished run has nothing to resume.
+    DataProcessor(resume=True, **kwargs).run(recipe)
+    assert not os.path.exists(log_filepath)
+
+    with pytest.raises(ValueError, match="its num_workers changed from 1 to 2"):
+        DataProcessor(resume=True, **{**kwargs, "num_workers": 2}).run(recipe)
+
+
+@pytest.mark.skipif(condition=sys.platform == "win32", reason="Not supported on windows")
+def test_data_processor_append(tmpdir, monkeypatch):
+    input_dir = os.path.join(tmpdir, "input_dir")
+    _create_text_files(input_dir, 30)
+    log_filepath = os.path.join(tmpdir, "items.log")
+    remote_output_dir = os.path.join(tmpdir, "remote_output_dir")
+    os.makedirs(remote_output_dir)
+    monkeypatch.setenv("DATA_OPTIMIZER_CACHE_FOLDER", os.path.join(tmpdir, "cache"))
+
+    kwargs = {
+        "name": "dummy_dataset",
+        "input_dir": input_dir,
+        "num_workers": 2,
+        "fast_dev_run": False,
+        "remote_output_dir": remote_output_dir,
+    }
+
+    with pytest.raises(FileNotFoundError, match="can't be appended to as its manifest"):
+        DataProcessor(append=True, **kwargs).run(LoggedRecipe(input_dir, 20, log_filepath))
+
+    DataProcessor(**kwargs).run(LoggedRecipe(input_dir, 20, log_filepath))
+    assert sorted(_read_logged_items(log_filepath)) == list(range(20))
+
+    # Only the new items are processed, by new ranks.
+    DataProcessor(append=True, **kwargs).run(LoggedRecipe(input_dir, 30, log_filepath))
+    assert sorted(_read_logged_items(log_filepath)) == list(range(20, 30))
+    assert {f.split("-")[1] for f in os.listdir(remote_output_dir) if f.endswith(".bin")} == {"0", "1", "2", "3"}
+
+    os.makedirs(os.path.join(tmpdir, "cache_dir"))
+    cache = Cache(os.path.join(tmpdir, "cache_dir"), remote_dir=remote_output_dir, chunk_size=2)
+    assert [cache[i] for i in range(len(cache))] == list(range(90))
+
+    DataProcessor(append=True, **kwargs).run(LoggedRecipe(input_dir, 30, log_filepath))
+    assert not os.path.exists(log_filepath)
+
+
 class TextTokenizeRecipe(DataChunkRecipe):
     def prepare_structure(self, input_dir: str) -> List[Any]:
         return [os.path.join(input_dir, "dummy2")]
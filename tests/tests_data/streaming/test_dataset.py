@@ -235,3 +235,173 @@ def test_streaming_dataset_deepcopy(tmpdir, monkeypatch):
         batches.append(batch)
 
     assert len(batches) == 10
+
+
+@pytest.mark.parametrize("drop_last", [False, True])
+def test_streaming_dataset_batch_size(drop_last, tmpdir):
+    seed_everything(42)
+
+    cache = Cache(tmpdir, chunk_size=10)
+    for i in range(101):
+        cache[i] = i
+
+    cache.done()
+    cache.merge()
+
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir, drop_last=drop_last, batch_size=8)
+    assert len(dataset) == 12 + int(not drop_last)
+
+    batches = list(dataset)
+    assert len(batches) == len(dataset)
+    assert all(isinstance(batch, torch.Tensor) for batch in batches)
+    assert batches[0].tolist() == list(range(8))
+    assert batches[1].tolist() == list(range(8, 16))
+    assert dataset.current_epoch == 1
+
+    expected = list(range(96)) if drop_last else list(range(101))
+    assert torch.cat(batches).tolist() == expected
+
+    dataloader = DataLoader(dataset, batch_size=None)
+    assert torch.cat(list(dataloader)).tolist() == expected
+    assert dataset.current_epoch == 2
+
+    with pytest.raises(ValueError, match="The batch_size should be greater or equal to 1"):
+        StreamingDataset(name="choco", cache_dir=tmpdir, batch_size=0)
+
+
+@pytest.mark.parametrize("num_interleaved_chunks", [1, 3])
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_streaming_dataset_resume(shuffle, num_workers, num_interleaved_chunks, tmpdir):
+    seed_everything(42)
+
+    cache = Cache(tmpdir, chunk_size=10)
+    for i in range(101):
+        cache[i] = i
+
+    cache.done()
+    cache.merge()
+
+    def create_dataloader():
+        dataset = StreamingDataset(
+            name="choco", cache_dir=tmpdir, shuffle=shuffle, num_interleaved_chunks=num_interleaved_chunks
+        )
+        return StreamingDataLoader(dataset, batch_size=4, num_workers=num_workers)
+
+    dataloader = create_dataloader()
+    expected = torch.cat(list(dataloader)).tolist()
+    assert dataloader.current_epoch == 1
+    assert sorted(expected) == list(range(101))
+
+    dataloader = create_dataloader()
+    for batch_idx, batch in enumerate(dataloader):
+        if batch_idx == 6:
+            break
+    state_dict = dataloader.state_dict()
+    assert state_dict["num_samples_yielded"] == 28
+    assert state_dict["dataset"]["num_samples_yielded"] == 28
+
+    dataloader = create_dataloader()
+    dataloader.load_state_dict(state_dict)
+    remaining = torch.cat(list(dataloader)).tolist()
+
+    if num_workers == 0:
+        assert remaining == expected[28:]
+    else:
+        # The batches are fetched from the workers in a round robin fashion.
+        assert sorted(remaining) == sorted(expected[28:])
+
+    # The state only applies to the epoch it was taken from.
+    assert dataloader.current_epoch == 1
+    assert dataloader.state_dict()["num_samples_yielded"] == 0
+    assert sorted(torch.cat(list(dataloader)).tolist()) == list(range(101))
+
+
+def test_streaming_dataset_resume_with_mismatched_state(tmpdir):
+    cache = Cache(tmpdir, chunk_size=10)
+    for i in range(20):
+        cache[i] = i
+
+    cache.done()
+    cache.merge()
+
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir)
+    state_dict = dataset.state_dict(num_samples_yielded=4, num_workers=2, batch_size=2)
+
+    with pytest.raises(ValueError, match="The provided `shuffle` state value doesn't match the current one"):
+        StreamingDataset(name="choco", cache_dir=tmpdir, shuffle=True).load_state_dict(state_dict)
+
+    dataset.load_state_dict(state_dict)
+    with pytest.raises(ValueError, match="The state was taken with 2 workers and can't be resumed with 1"):
+        iter(dataset)
+
+
+def test_streaming_dataset_interleaved_chunks(tmpdir):
+    seed_everything(42)
+
+    cache = Cache(tmpdir, chunk_size=10)
+    for i in range(90):
+        cache[i] = i
+
+    cache.done()
+    cache.merge()
+
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir, shuffle=True, num_interleaved_chunks=3)
+    items = list(dataset)
+    assert sorted(items) == list(range(90))
+
+    # The items are drawn across the chunks read together, one group of chunks at a time.
+    chunk_groups = [sorted({item // 10 for item in items[i : i + 30]}) for i in range(0, 90, 30)]
+    assert all(len(chunks) == 3 for chunks in chunk_groups)
+    assert sorted(chunk for chunks in chunk_groups for chunk in chunks) == list(range(9))
+
+    # The order is deterministic given the seed and the epoch.
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir, shuffle=True, num_interleaved_chunks=3)
+    assert list(dataset) == items
+    assert list(dataset) != items
+
+    # Interleaving a single chunk is the default behaviour.
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir, shuffle=True)
+    expected = list(dataset)
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir, shuffle=True, num_interleaved_chunks=1)
+    assert list(dataset) == expected
+
+    with pytest.raises(ValueError, match="The num_interleaved_chunks should be greater or equal to 1"):
+        StreamingDataset(name="choco", cache_dir=tmpdir, num_interleaved_chunks=0)
+
+
+@pytest.mark.parametrize("drop_last", [False, True])
+@pytest.mark.parametrize("world_size", [1, 3, 7, 16])
+def test_full_shuffle_assignment(world_size, drop_last, tmpdir):
+    cache = Cache(tmpdir, chunk_size=10)
+    for i in range(101):
+        cache[i] = i
+
+    cache.done()
+    cache.merge()
+
+    dataset = StreamingDataset(name="choco", cache_dir=tmpdir, shuffle=True, drop_last=drop_last)
+    chunks_per_ranks, intervals_per_ranks = dataset.shuffle.get_chunks_and_intervals_per_ranks(
+        _DistributedEnv(world_size, 0), 0
+    )
+    chunk_intervals = cache.get_chunk_intervals()
+
+    items_per_ranks = []
+    for chunks, intervals in zip(chunks_per_ranks, intervals_per_ranks):
+        assert len(chunks) == len(intervals)
+        items = []
+        for chunk_index, (begin, end) in zip(chunks, intervals):
+            # Each interval is a non-empty part of its chunk.
+            assert chunk_intervals[chunk_index][0] <= begin < end <= chunk_intervals[chunk_index][1]
+            items.extend(range(begin, end))
+        items_per_ranks.append(items)
+
+    # The ranks receive the same number of items, the last one gets the remainder unless dropped.
+    num_items = [len(items) for items in items_per_ranks]
+    assert num_items[:-1] == [101 // world_size] * (world_size - 1)
+    assert num_items[-1] == 101 // world_size + (0 if drop_last else 101 % world_size)
+
+    all_items = [item for items in items_per_ranks for item in items]
+    assert len(set(all_items)) == len(all_items)
+    if not drop_last:
+        assert sorted(all_items) == list(range(101))
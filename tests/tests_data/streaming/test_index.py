@@ -0,0 +1,87 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+from lightning.data.streaming import Cache
+from lightning.data.streaming.index import ChunksIndex, load_index, save_index
+
+
+def _generate_chunks(num_chunks, compression=None):
+    chunks = []
+    for i in range(num_chunks):
+        chunk = {"chunk_bytes": 100 + i, "chunk_size": 10 + i, "filename": f"chunk-0-{i}.bin", "dim": None}
+        if compression:
+            chunk["compression"] = compression
+            chunk["frame_sizes"] = list(range(1, i + 2))
+        chunks.append(chunk)
+    return chunks
+
+
+def test_chunks_index_save_and_load(tmpdir):
+    chunks = _generate_chunks(5) + _generate_chunks(3, compression="zstd")
+    chunks[1]["dim"] = 42
+    config = {"compression": None, "data_format": ["int"]}
+
+    filepath = os.path.join(tmpdir, "index.idx")
+    save_index(filepath, config, ChunksIndex.from_chunks(chunks))
+
+    loaded_config, index = load_index(filepath)
+    assert loaded_config == config
+    assert len(index) == 8
+    assert list(index) == chunks
+    assert index[-1] == chunks[-1]
+    assert isinstance(index.chunk_sizes.base, np.memmap)
+    np.testing.assert_array_equal(index.chunk_sizes, [chunk["chunk_size"] for chunk in chunks])
+
+    with pytest.raises(IndexError, match="out of range"):
+        index[8]
+
+    # The memory mapped index is mapped again when unpickled.
+    state = index.__getstate__()
+    assert state["_columns"] is None
+    assert list(pickle.loads(pickle.dumps(index))) == chunks
+
+    with open(filepath, "r+b") as f:
+        f.write(b"NOTINDEX")
+    with pytest.raises(ValueError, match="isn't a binary chunks index"):
+        load_index(filepath)
+
+
+def test_chunks_index_concatenate():
+    indexes = [
+        ChunksIndex.from_chunks(_generate_chunks(2, compression="zstd")),
+        ChunksIndex.from_chunks(_generate_chunks(3)),
+        ChunksIndex.from_chunks([]),
+        ChunksIndex.from_chunks(_generate_chunks(2, compression="lz4")),
+    ]
+    index = ChunksIndex.concatenate(indexes)
+    assert list(index) == [chunk for chunks in indexes for chunk in chunks]
+    assert index.get_compression(0) == "zstd"
+    assert index.get_compression(2) is None
+    assert index.get_compression(6) == "lz4"
+    assert index.get_frame_sizes(6) == [1, 2]
+
+    assert len(ChunksIndex.concatenate([])) == 0
+
+
+def test_cache_reads_json_index(tmpdir):
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    os.makedirs(cache_dir)
+    cache = Cache(cache_dir, chunk_size=10)
+    for i in range(50):
+        cache[i] = i
+    cache.done()
+    cache.merge()
+
+    # Convert the index to the JSON format used by the datasets optimized before the binary index.
+    config, index = load_index(os.path.join(cache_dir, "index.idx"))
+    with open(os.path.join(cache_dir, "index.json"), "w") as f:
+        json.dump({"chunks": list(index), "config": config}, f)
+    os.remove(os.path.join(cache_dir, "index.idx"))
+
+    cache = Cache(cache_dir, chunk_size=10)
+    assert cache.filled
+    assert len(cache) == 50
+    assert [cache[i] for i in range(50)] == list(range(50))
@@ -0,0 +1,274 @@
+# Copyright The Lightning AI team.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from time import sleep
+
+import pytest
+from lightning.data.streaming import Cache
+from lightning.data.streaming.cache import _convert_bytes_to_int
+from lightning.data.streaming.config import ChunksConfig
+from lightning.data.streaming.downloader import LocalDownloader, _coalesce_ranges
+from lightning.data.streaming.item_loader import PyTreeLoader
+from lightning.data.streaming.reader import BinaryReader, PrepareChunksThread
+
+
+def _create_remote_dataset(remote_dir, num_items=100, chunk_size=10):
+    os.makedirs(remote_dir, exist_ok=True)
+    cache = Cache(remote_dir, chunk_size=chunk_size)
+    # All the items have the same number of bytes, so do the chunks.
+    for i in range(num_items):
+        cache[i] = 100 + i
+    cache.done()
+    cache.merge()
+
+
+def test_prepare_chunks_thread_eviction(tmpdir):
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(remote_dir)
+    os.makedirs(cache_dir)
+
+    config = ChunksConfig.load(cache_dir, remote_dir)
+    chunk_bytes = os.path.getsize(os.path.join(remote_dir, "chunk-0-0.bin"))
+
+    thread = PrepareChunksThread(config, max_cache_size=2 * chunk_bytes, max_pre_download=4)
+    thread.start()
+    wait_for_chunk = thread.wait
+
+    thread.add([0, 1, 2])
+    wait_for_chunk(0)
+    wait_for_chunk(1)
+
+    # The chunks in use are never evicted, even when the budget is exceeded.
+    wait_for_chunk(2)
+    assert thread.stats["evicted_bytes"] == 0
+    assert sorted(os.listdir(cache_dir)) == ["chunk-0-0.bin", "chunk-0-1.bin", "chunk-0-2.bin", "index.idx"]
+
+    # The released chunks are evicted in least recently used order to make room for the new chunk.
+    thread.release(0)
+    thread.release(1)
+    thread.add([3])
+    wait_for_chunk(3)
+    assert sorted(os.listdir(cache_dir)) == ["chunk-0-2.bin", "chunk-0-3.bin", "index.idx"]
+    assert thread.stats["evicted_bytes"] == 2 * chunk_bytes
+
+    # A chunk still available locally is a hit, an evicted chunk needs to be downloaded again.
+    thread.release(2)
+    thread.add([2, 0])
+    wait_for_chunk(2)
+    wait_for_chunk(0)
+    assert thread.stats["hits"] == 1
+    assert thread.stats["misses"] == 5
+    assert sorted(os.listdir(cache_dir)) == ["chunk-0-0.bin", "chunk-0-2.bin", "chunk-0-3.bin", "index.idx"]
+
+
+def test_prepare_chunks_thread_pre_download_window(tmpdir):
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(remote_dir)
+    os.makedirs(cache_dir)
+
+    config = ChunksConfig.load(cache_dir, remote_dir)
+    thread = PrepareChunksThread(config, max_pre_download=2, num_downloaders=2)
+    thread.start()
+
+    def list_chunks():
+        return sorted(f for f in os.listdir(cache_dir) if f.endswith(".bin"))
+
+    def wait_for_num_chunks(num_chunks):
+        with thread._condition:
+            while len(thread._chunks_index_ready) < num_chunks:
+                thread._condition.wait()
+
+    thread.add(list(range(10)))
+    wait_for_num_chunks(2)
+    sleep(0.05)
+    assert list_chunks() == ["chunk-0-0.bin", "chunk-0-1.bin"]
+
+    # Reaching a chunk moves the window forward.
+    thread.wait(0)
+    wait_for_num_chunks(3)
+    sleep(0.05)
+    assert list_chunks() == ["chunk-0-0.bin", "chunk-0-1.bin", "chunk-0-2.bin"]
+
+    # A chunk the reader is blocked on bypasses the window and the queue order.
+    thread.wait(8)
+    assert list_chunks() == ["chunk-0-0.bin", "chunk-0-1.bin", "chunk-0-2.bin", "chunk-0-8.bin"]
+    assert len(thread._chunks_index_to_be_processed) == 6
+
+
+def test_prepare_chunks_thread_download_error(tmpdir):
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(remote_dir)
+    os.makedirs(cache_dir)
+
+    config = ChunksConfig.load(cache_dir, remote_dir)
+    os.remove(os.path.join(remote_dir, "chunk-0-1.bin"))
+
+    thread = PrepareChunksThread(config)
+    thread.start()
+    thread.add([0, 1, 2])
+    thread.wait(0)
+
+    with pytest.raises(RuntimeError, match="Failed to download the chunk 1."):
+        thread.wait(1)
+
+    thread.wait(2)
+
+
+def test_reader_with_max_cache_size(tmpdir):
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(remote_dir)
+    os.makedirs(cache_dir)
+
+    chunk_bytes = os.path.getsize(os.path.join(remote_dir, "chunk-0-0.bin"))
+    cache = Cache(cache_dir, remote_dir=remote_dir, chunk_size=10, max_cache_size=3 * chunk_bytes)
+
+    for epoch in range(2):
+        for i in range(100):
+            assert cache[i] == 100 + i
+            num_chunks = len([f for f in os.listdir(cache_dir) if f.endswith(".bin")])
+            assert num_chunks <= 3
+
+    stats = cache._reader.cache_stats
+    assert stats["evicted_bytes"] > 0
+    assert stats["cache_size"] <= 3 * chunk_bytes
+
+
+@pytest.mark.parametrize(
+    ("size", "expected"),
+    [(10, 10), ("10", 10), ("200GB", 200 * 1000**3), ("1.5 MB", 1_500_000), ("2GiB", 2 << 30), ("3kb", 3000)],
+)
+def test_convert_bytes_to_int(size, expected):
+    assert _convert_bytes_to_int(size) == expected
+
+
+def test_convert_bytes_to_int_invalid():
+    with pytest.raises(ValueError, match="Unsupported size format"):
+        _convert_bytes_to_int("200 apples")
+
+
+def test_pytree_loader_keeps_chunks_memory_mapped(tmpdir):
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(cache_dir)
+
+    item_loader = PyTreeLoader(max_open_chunks=2)
+    cache = Cache(cache_dir, chunk_size=10, item_loader=item_loader)
+
+    for i in range(30):
+        assert cache[i] == 100 + i
+    assert list(item_loader._buffers) == [1, 2]
+
+    # Reading from an open chunk marks it as the most recently used one.
+    assert cache[15] == 115
+    assert cache[35] == 135
+    assert list(item_loader._buffers) == [1, 3]
+
+    item_loader.delete(1, os.path.join(cache_dir, "chunk-0-1.bin"))
+    assert list(item_loader._buffers) == [3]
+
+    state = item_loader.__getstate__()
+    assert state["_mmaps"] == {}
+    assert len(state["_buffers"]) == 0
+
+
+def test_reader_read_many(tmpdir):
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(remote_dir)
+    os.makedirs(cache_dir)
+
+    cache = Cache(cache_dir, remote_dir=remote_dir, chunk_size=10)
+    indexes = [5, 6, 7, 8, 9, 10, 11, 3, 95, 42]
+    assert cache.__getitems__(indexes) == [100 + i for i in indexes]
+
+    # The items of a chunk are loaded together, even when interleaved with the items of other chunks.
+    indexes = [12, 55, 13, 50, 14, 59]
+    assert cache.__getitems__(indexes) == [100 + i for i in indexes]
+    assert cache.__getitems__([]) == []
+
+    with pytest.raises(ValueError, match="expects a list of chunked Index"):
+        cache._reader.read_many([1])
+
+
+def test_reader_range_read(tmpdir, monkeypatch):
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    _create_remote_dataset(remote_dir)
+    os.makedirs(cache_dir)
+
+    requested_ranges = []
+    read_range = LocalDownloader.read_range
+
+    def spy_read_range(self, remote_filepath, begin, end):
+        requested_ranges.append((os.path.basename(remote_filepath), begin, end))
+        return read_range(self, remote_filepath, begin, end)
+
+    monkeypatch.setattr(LocalDownloader, "read_range", spy_read_range)
+
+    cache = Cache(cache_dir, remote_dir=remote_dir, chunk_size=10, range_read=True)
+    assert cache[42] == 142
+    assert cache.__getitems__([43, 44, 45, 71, 2]) == [143, 144, 145, 171, 102]
+
+    # The chunks are never downloaded.
+    assert os.listdir(cache_dir) == ["index.idx"]
+
+    # The offsets table is read once per chunk and the adjacent items are read with a single request.
+    assert [filename for filename, _, _ in requested_ranges] == [
+        "chunk-0-4.bin",
+        "chunk-0-4.bin",
+        "chunk-0-4.bin",
+        "chunk-0-7.bin",
+        "chunk-0-7.bin",
+        "chunk-0-0.bin",
+        "chunk-0-0.bin",
+    ]
+    assert requested_ranges[0][1:] == (4, 48)
+
+    with pytest.raises(ValueError, match="Reading byte ranges isn't supported for compressed chunks"):
+        BinaryReader(cache_dir, remote_dir=remote_dir, compression="zstd", range_read=True)
+
+
+def test_coalesce_ranges():
+    assert _coalesce_ranges([], 0) == ([], [])
+    assert _coalesce_ranges([(10, 20), (0, 5), (20, 30), (40, 50)], 0) == ([(0, 5), (10, 30), (40, 50)], [1, 0, 1, 2])
+    assert _coalesce_ranges([(10, 20), (0, 5), (20, 30), (40, 50)], 10) == ([(0, 50)], [0, 0, 0, 0])
+    assert _coalesce_ranges([(0, 10), (2, 4)], 0) == ([(0, 10)], [0, 0])
+
+
+def test_chunks_config_chunk_indices_for(tmpdir):
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    os.makedirs(cache_dir)
+    cache = Cache(cache_dir, chunk_bytes=90)
+    for i in range(100):
+        cache[i] = i
+    cache.done()
+    cache.merge()
+
+    config = ChunksConfig.load(cache_dir)
+    expected = [
+        next(chunk_index for chunk_index, (begin, end) in enumerate(config.intervals) if begin <= index < end)
+        for index in range(100)
+    ]
+    assert [config._get_chunk_index_from_index(index) for index in range(100)] == expected
+    assert config.chunk_indices_for(list(range(100))).tolist() == expected
+    assert config.chunk_indices_for([]).tolist() == []
+
+    with pytest.raises(ValueError, match="The provided index 100 didn't find a match"):
+        config._get_chunk_index_from_index(100)
+
+    with pytest.raises(ValueError, match=r"The provided indices \[-1, 100\] didn't find a match"):
+        config.chunk_indices_for([3, -1, 100])
@@ -126,3 +126,16 @@ def test_assert_no_header_tensor_serializer():
     assert serializer._dtype == torch.float32
     new_t = serializer.deserialize(data)
     assert torch.equal(t, new_t)
+
+
+def test_tensor_serializer_deserialize_without_copy():
+    serializer = TensorSerializer()
+    tensor = torch.arange(24, dtype=torch.float32).reshape(2, 3, 4)
+    data, _ = serializer.serialize(tensor)
+
+    # The tensor is deserialized as a view over the provided buffer.
+    buffer = bytearray(b"\0" * 8) + data
+    view = memoryview(buffer)[8:]
+    deserialized_tensor = serializer.deserialize(view)
+    assert torch.equal(deserialized_tensor, tensor)
+    assert deserialized_tensor.data_ptr() == np.frombuffer(view, np.uint8).ctypes.data + 8 + 4 * 3
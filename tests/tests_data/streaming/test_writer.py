@@ -11,12 +11,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import os
 
 import numpy as np
 import pytest
+import torch
 from lightning import seed_everything
+from lightning.data.streaming import Cache, compression
+from lightning.data.streaming.compression import _LZ4_AVAILABLE, _ZSTD_AVAILABLE
+from lightning.data.streaming.index import load_index
+from lightning.data.streaming.item_loader import TokensLoader
 from lightning.data.streaming.reader import BinaryReader
 from lightning.data.streaming.sampler import ChunkedIndex
 from lightning.data.streaming.writer import BinaryWriter
@@ -29,7 +33,7 @@ def test_binary_writer_with_ints_and_chunk_bytes(tmpdir):
     with pytest.raises(FileNotFoundError, match="The provided cache directory `dontexists` doesn't exist."):
         BinaryWriter("dontexists", {})
 
-    with pytest.raises(ValueError, match="No compresion algorithms are installed."):
+    with pytest.raises(ValueError, match="No compresion algorithms are installed|isn't available"):
         BinaryWriter(tmpdir, {"i": "int"}, compression="something_else")
 
     binary_writer = BinaryWriter(tmpdir, chunk_bytes=90)
@@ -42,14 +46,13 @@ def test_binary_writer_with_ints_and_chunk_bytes(tmpdir):
     binary_writer.merge()
     assert len(os.listdir(tmpdir)) == 21
 
-    with open(os.path.join(tmpdir, "index.json")) as f:
-        data = json.load(f)
+    _, chunks = load_index(os.path.join(tmpdir, "index.idx"))
 
-    assert data["chunks"][0]["chunk_size"] == 6
-    assert data["chunks"][1]["chunk_size"] == 5
-    assert data["chunks"][-1]["chunk_size"] == 4
+    assert chunks[0]["chunk_size"] == 6
+    assert chunks[1]["chunk_size"] == 5
+    assert chunks[-1]["chunk_size"] == 4
 
-    chunk_sizes = np.cumsum([chunk["chunk_size"] for chunk in data["chunks"]])
+    chunk_sizes = np.cumsum([chunk["chunk_size"] for chunk in chunks])
 
     reader = BinaryReader(tmpdir)
     for i in range(100):
@@ -67,7 +70,7 @@ def test_binary_writer_with_ints_and_chunk_size(tmpdir):
     with pytest.raises(FileNotFoundError, match="The provided cache directory `dontexists` doesn't exist."):
         BinaryWriter("dontexists", {})
 
-    with pytest.raises(ValueError, match="No compresion algorithms are installed."):
+    with pytest.raises(ValueError, match="No compresion algorithms are installed|isn't available"):
         BinaryWriter(tmpdir, {"i": "int"}, compression="something_else")
 
     binary_writer = BinaryWriter(tmpdir, chunk_size=25)
@@ -83,12 +86,11 @@ def test_binary_writer_with_ints_and_chunk_size(tmpdir):
     binary_writer.merge()
     assert len(os.listdir(tmpdir)) == 5
 
-    with open(os.path.join(tmpdir, "index.json")) as f:
-        data = json.load(f)
+    _, chunks = load_index(os.path.join(tmpdir, "index.idx"))
 
-    assert data["chunks"][0]["chunk_size"] == 25
-    assert data["chunks"][1]["chunk_size"] == 25
-    assert data["chunks"][-1]["chunk_size"] == 25
+    assert chunks[0]["chunk_size"] == 25
+    assert chunks[1]["chunk_size"] == 25
+    assert chunks[-1]["chunk_size"] == 25
 
     reader = BinaryReader(tmpdir)
     for i in range(100):
@@ -121,12 +123,11 @@ def test_binary_writer_with_jpeg_and_int(tmpdir):
     binary_writer.merge()
     assert len(os.listdir(cache_dir)) == 26
 
-    with open(os.path.join(cache_dir, "index.json")) as f:
-        data = json.load(f)
+    _, chunks = load_index(os.path.join(cache_dir, "index.idx"))
 
-    assert data["chunks"][0]["chunk_size"] == 4
-    assert data["chunks"][1]["chunk_size"] == 4
-    assert data["chunks"][-1]["chunk_size"] == 4
+    assert chunks[0]["chunk_size"] == 4
+    assert chunks[1]["chunk_size"] == 4
+    assert chunks[-1]["chunk_size"] == 4
 
     reader = BinaryReader(cache_dir)
     for i in range(100):
@@ -160,13 +161,12 @@ def test_binary_writer_with_jpeg_filepath_and_int(tmpdir):
     binary_writer.merge()
     assert len(os.listdir(cache_dir)) == 26
 
-    with open(os.path.join(cache_dir, "index.json")) as f:
-        data = json.load(f)
+    _, chunks = load_index(os.path.join(cache_dir, "index.idx"))
 
-    assert data["chunks"][0]["chunk_size"] == 4
-    assert data["chunks"][1]["chunk_size"] == 4
-    assert data["chunks"][-1]["chunk_size"] == 4
-    assert sum([chunk["chunk_size"] for chunk in data["chunks"]]) == 100
+    assert chunks[0]["chunk_size"] == 4
+    assert chunks[1]["chunk_size"] == 4
+    assert chunks[-1]["chunk_size"] == 4
+    assert sum([chunk["chunk_size"] for chunk in chunks]) == 100
 
     reader = BinaryReader(cache_dir)
     for i in range(100):
@@ -194,3 +194,90 @@ def test_binary_writer_with_jpeg_and_png(tmpdir):
 
     with pytest.raises(ValueError, match="The data format changed between items"):
         binary_writer[2] = {"x": 2, "y": 1}
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [
+        pytest.param("zstd", marks=pytest.mark.skipif(not _ZSTD_AVAILABLE, reason="Requires: ['zstd']")),
+        pytest.param("lz4:4", marks=pytest.mark.skipif(not _LZ4_AVAILABLE, reason="Requires: ['lz4']")),
+    ],
+)
+def test_binary_writer_with_compression(codec, tmpdir, monkeypatch):
+    monkeypatch.setattr(compression, "_COMPRESSION_FRAME_BYTES", 64)
+    remote_dir = os.path.join(tmpdir, "remote_dir")
+    cache_dir = os.path.join(tmpdir, "cache_dir")
+    os.makedirs(remote_dir)
+    os.makedirs(cache_dir)
+
+    binary_writer = BinaryWriter(remote_dir, chunk_size=10, compression=codec)
+    for i in range(100):
+        binary_writer[i] = {"i": i, "text": f"item {i}" * 10}
+    binary_writer.done()
+    binary_writer.merge()
+
+    _, chunks = load_index(os.path.join(remote_dir, "index.idx"))
+
+    # The codec and the compressed frames are recorded per chunk.
+    chunk = chunks[0]
+    assert chunk["filename"] == f"chunk-0-0.{codec}.bin"
+    assert chunk["compression"] == codec
+    assert len(chunk["frame_sizes"]) > 1
+    assert sum(chunk["frame_sizes"]) == os.path.getsize(os.path.join(remote_dir, chunk["filename"]))
+
+    # A local dataset is decompressed next to the compressed chunks.
+    reader = BinaryReader(remote_dir)
+    assert reader.read(ChunkedIndex(15, chunk_index=1)) == {"i": 15, "text": "item 15" * 10}
+    assert os.path.exists(os.path.join(remote_dir, f"chunk-0-1.{codec}.bin"))
+    assert os.path.exists(os.path.join(remote_dir, "chunk-0-1.bin"))
+
+    # A remote dataset only keeps the decompressed chunks locally.
+    cache = Cache(cache_dir, remote_dir=remote_dir, chunk_size=10)
+    for i in range(100):
+        assert cache[i] == {"i": i, "text": f"item {i}" * 10}
+    assert sorted(os.listdir(cache_dir)) == sorted(["index.idx"] + [f"chunk-0-{i}.bin" for i in range(10)])
+
+
+def test_binary_writer_with_items_out_of_order(tmpdir):
+    def write(cache_dir, indices):
+        os.makedirs(cache_dir)
+        binary_writer = BinaryWriter(cache_dir, chunk_bytes=90)
+        for i in indices:
+            binary_writer[i] = {"i": i, "i+1": i + 1}
+
+        with pytest.raises(ValueError, match="The provided index 99 already exists"):
+            binary_writer[99] = {"i": 99, "i+1": 100}
+
+        binary_writer.done()
+        binary_writer.merge()
+        return load_index(os.path.join(cache_dir, "index.idx"))[1]
+
+    # The first items are provided late, so the items already appended to the chunk buffer are moved back.
+    indices = list(range(100))
+    chunks = write(os.path.join(tmpdir, "out_of_order"), indices[2:6] + indices[:2] + indices[6:])
+    assert list(chunks) == list(write(os.path.join(tmpdir, "sequential"), indices))
+    assert [chunk["chunk_size"] for chunk in chunks][:3] == [9, 7, 7]
+
+    reader = BinaryReader(os.path.join(tmpdir, "out_of_order"))
+    intervals = reader.get_chunk_intervals()
+    for i in range(100):
+        chunk_index = next(index for index, (begin, end) in enumerate(intervals) if begin <= i < end)
+        assert reader.read(ChunkedIndex(i, chunk_index=chunk_index)) == {"i": i, "i+1": i + 1}
+
+
+def test_binary_writer_copies_pending_tensors(tmpdir):
+    binary_writer = BinaryWriter(tmpdir, chunk_size=40)
+    tensors = {i: torch.full((4,), i) for i in range(10)}
+
+    # The items following a missing one are kept aside, so they can't be views over the provided tensors.
+    for i in [0] + list(range(2, 10)):
+        binary_writer[i] = tensors[i]
+    for tensor in tensors.values():
+        tensor.fill_(-1)
+    binary_writer[1] = torch.full((4,), 1)
+    binary_writer.done()
+    binary_writer.merge()
+
+    reader = BinaryReader(tmpdir, item_loader=TokensLoader(block_size=1))
+    tokens = [reader.read(ChunkedIndex(i, chunk_index=0)).item() for i in range(40)]
+    assert tokens == [i for i in range(10) for _ in range(4)]
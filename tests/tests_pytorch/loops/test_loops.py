@@ -524,6 +524,43 @@ def test_loop_state_on_complete_run(tmpdir):
     assert checkpoint["loops"]["fit_loop"] == expected
 
 
+class _StatefulDataLoader(DataLoader):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.num_iterations = 0
+        self.loaded_state_dict = None
+
+    def __iter__(self):
+        self.num_iterations += 1
+        return super().__iter__()
+
+    def state_dict(self):
+        return {"num_iterations": self.num_iterations}
+
+    def load_state_dict(self, state_dict):
+        assert self.num_iterations == 0
+        self.loaded_state_dict = state_dict
+        self.num_iterations = state_dict["num_iterations"]
+
+
+def test_fit_loop_save_and_restore_dataloaders(tmp_path):
+    class TestModel(BoringModel):
+        def train_dataloader(self):
+            return _StatefulDataLoader(RandomDataset(32, 4))
+
+    trainer = Trainer(default_root_dir=tmp_path, max_epochs=2, limit_val_batches=0, logger=False)
+    trainer.fit(TestModel())
+    ckpt_path = trainer.checkpoint_callback.best_model_path
+    checkpoint = torch.load(ckpt_path)
+    assert checkpoint["loops"]["fit_loop"]["state_dict"]["combined_loader"] == [{"num_iterations": 2}]
+
+    # the state is loaded into the new dataloader before iterating over it
+    trainer = Trainer(default_root_dir=tmp_path, max_epochs=3, limit_val_batches=0, logger=False)
+    trainer.fit(TestModel(), ckpt_path=ckpt_path)
+    assert trainer.fit_loop._combined_loader.flattened[0].loaded_state_dict == {"num_iterations": 2}
+    assert trainer.fit_loop._combined_loader_states_to_load == []
+
+
 def test_fit_loop_reset(tmpdir):
     """Test that the reset logic in fit- and epoch loop is aware of whether the loop is restarting from a completed
     loop or from a mid-epoch checkpoint."""
@@ -602,3 +602,30 @@ def test_combined_loader_can_be_pickled():
 
     # no error
     pickle.dumps(cl)
+
+
+class _StatefulIterable:
+    def __init__(self, state=0):
+        self.state = state
+
+    def __iter__(self):
+        return iter(range(self.state, 5))
+
+    def state_dict(self):
+        return {"state": self.state}
+
+    def load_state_dict(self, state_dict):
+        self.state = state_dict["state"]
+
+
+def test_combined_loader_state_dicts():
+    cl = CombinedLoader([_StatefulIterable(1), range(3), _StatefulIterable(2)])
+    assert cl._state_dicts() == [{"state": 1}, {"state": 2}]
+
+    cl = CombinedLoader([_StatefulIterable(), range(3), _StatefulIterable()])
+    cl._load_state_dicts([])
+    cl._load_state_dicts([{"state": 3}, {"state": 4}])
+    assert [loader.state for loader in cl.flattened if isinstance(loader, _StatefulIterable)] == [3, 4]
+
+    with pytest.raises(RuntimeError, match="has 2 stateful loaders, but found 1 states in the checkpoint"):
+        cl._load_state_dicts([{"state": 0}])